@@ -0,0 +1,165 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Codec micro-benchmarks, run with: python -m benchmarks [--output results.json] [--baseline baseline.json]"""
+
+import argparse
+import itertools
+import json
+import platform
+import re
+import sys
+import timeit
+import typing as t
+
+from benchmarks.frames import (
+    COMPRESSOR_STOPPED_DIFF,
+    DHW_FRAME,
+    HEARTBEAT_DIFF,
+    HEATING_FRAME,
+    HEATING_TO_DHW_DIFF,
+    IDLE_FRAME,
+    MALFORMED_FRAME,
+)
+from toshiba_estia.device import ToshibaAcDevice
+from toshiba_estia.device.fcu_state import ToshibaAcFcuState
+from toshiba_estia.utils.http_api import EstiaWaterTemperatureInfo
+
+Case = t.Callable[[], object]
+
+# Legacy AC properties without a counterpart in the Estia state
+UNSUPPORTED_DEVICE_PROPERTIES = {"ac_indoor_temperature"}
+
+
+def public_properties(cls: type) -> t.List[str]:
+    return sorted(name for name in dir(cls) if not name.startswith("_") and isinstance(getattr(cls, name), property))
+
+
+def fcu_state_cases() -> t.Dict[str, Case]:
+    cases: t.Dict[str, Case] = {}
+    frame = bytes.fromhex(HEATING_FRAME)
+
+    cases["fcu_state.from_hex_state"] = lambda: ToshibaAcFcuState.from_hex_state(HEATING_FRAME)
+
+    decoded = ToshibaAcFcuState()
+    cases["fcu_state.decode"] = lambda: decoded.decode(HEATING_FRAME)
+    cases["fcu_state.decode_fields"] = lambda: ToshibaAcFcuState.decode_fields(frame)
+
+    cases["fcu_state.parse_frame.valid"] = lambda: ToshibaAcFcuState.parse_frame(COMPRESSOR_STOPPED_DIFF)
+    cases["fcu_state.parse_frame.bytes"] = lambda: ToshibaAcFcuState.parse_frame(frame)
+    cases["fcu_state.parse_frame.malformed"] = lambda: ToshibaAcFcuState.parse_frame(MALFORMED_FRAME)
+
+    merger = ToshibaAcFcuState()
+    cases["fcu_state.merge"] = lambda: merger.merge(COMPRESSOR_STOPPED_DIFF, HEATING_FRAME)
+
+    unchanged = ToshibaAcFcuState.from_hex_state(HEATING_FRAME)
+    cases["fcu_state.update.unchanged"] = lambda: unchanged.update(HEARTBEAT_DIFF)
+
+    # Alternates between two frames so that every update changes something
+    toggled = ToshibaAcFcuState.from_hex_state(HEATING_FRAME)
+    next_diff = itertools.cycle([HEATING_TO_DHW_DIFF, HEATING_FRAME]).__next__
+    cases["fcu_state.update.changed"] = lambda: toggled.update(next_diff())
+
+    for name, hex_state in (("heating", HEATING_FRAME), ("dhw", DHW_FRAME), ("idle", IDLE_FRAME)):
+        state = ToshibaAcFcuState.from_hex_state(hex_state)
+        for prop in public_properties(ToshibaAcFcuState):
+            cases[f"fcu_state.{prop}.{name}"] = getattr_case(state, prop)
+
+    return cases
+
+
+def device_cases() -> t.Dict[str, Case]:
+    device = ToshibaAcDevice(
+        "Benchmark",
+        "benchmark_device",
+        "ac_id",
+        "ac_unique_id",
+        HEATING_FRAME,
+        "1.0",
+        "0",
+        "1",
+        t.cast(t.Any, None),
+        t.cast(t.Any, None),
+    )
+    device.temperatures = EstiaWaterTemperatureInfo(two=0x86, twi=0x7C, tho=0x50, to=0x3A, tfi=0x5E, room_water=0x70)
+
+    cases: t.Dict[str, Case] = {
+        f"device.{prop}": getattr_case(device, prop)
+        for prop in public_properties(ToshibaAcDevice)
+        if prop not in UNSUPPORTED_DEVICE_PROPERTIES
+    }
+    cases["device.snapshot"] = device.snapshot
+    cases["device.publish_snapshot"] = device.publish_snapshot
+
+    return cases
+
+
+def getattr_case(obj: object, name: str) -> Case:
+    return lambda: getattr(obj, name)
+
+
+def measure(case: Case, min_time: float) -> t.Dict[str, float]:
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=5, number=number)) / number
+
+    return {"ns_per_op": best * 1e9, "ops_per_s": 1 / best, "number": number}
+
+
+def compare(results: t.Dict[str, t.Dict[str, float]], baseline: t.Dict[str, t.Any]) -> t.Dict[str, float]:
+    """Ratio of current to baseline time per benchmark, below 1.0 is faster."""
+    base_results = baseline.get("results", {})
+    return {
+        name: result["ns_per_op"] / base_results[name]["ns_per_op"]
+        for name, result in results.items()
+        if name in base_results
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Toshiba Estia codec micro-benchmarks")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--filter", default="", help="Only run benchmarks matching this regular expression")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimal time of a single timing run in seconds")
+    args = parser.parse_args()
+
+    cases = {**fcu_state_cases(), **device_cases()}
+    selected = {name: case for name, case in cases.items() if re.search(args.filter, name)}
+
+    report: t.Dict[str, t.Any] = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": {name: measure(case, args.min_time) for name, case in selected.items()},
+    }
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["baseline_ratio"] = compare(report["results"], json.load(baseline_file))
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per account footprint of standalone managers and a shared host, run with: python -m benchmarks.device_host [accounts]
+
+Accounts are populated from the synthetic fleet without any network traffic. The AMQP client is left out, it is
+per account in both setups.
+"""
+
+import asyncio
+import sys
+import tracemalloc
+import typing as t
+
+import aiohttp
+
+from benchmarks.device_memory import synthetic_fleet
+from toshiba_estia.device_host import ToshibaAcDeviceHost
+from toshiba_estia.device_manager import ToshibaAcDeviceManager
+from toshiba_estia.utils.http_api import ToshibaAcHttpApi
+
+DEVICES_PER_ACCOUNT = 5
+
+
+class OfflineAmqpApi:
+    """Stands in for the IoT Hub client, which is opened per account by both setups."""
+
+    async def shutdown(self) -> None:
+        pass
+
+
+def populate(manager: ToshibaAcDeviceManager, session: aiohttp.ClientSession) -> None:
+    manager.http_api = ToshibaAcHttpApi(manager.username, manager.password, session)
+    manager.amqp_api = t.cast(t.Any, OfflineAmqpApi())
+
+    for device_info in synthetic_fleet(DEVICES_PER_ACCOUNT):
+        manager.add_device(device_info)
+
+    manager.schedule_periodic_jobs()
+
+
+async def standalone(accounts: int) -> t.List[ToshibaAcDeviceManager]:
+    managers = []
+
+    for i in range(accounts):
+        manager = ToshibaAcDeviceManager(f"user{i}", "password", session=aiohttp.ClientSession())
+        assert manager.session
+        populate(manager, manager.session)
+        managers.append(manager)
+
+    return managers
+
+
+async def shared(accounts: int) -> ToshibaAcDeviceHost:
+    host = ToshibaAcDeviceHost()
+
+    for i in range(accounts):
+        manager = host.add_account(f"account{i}", f"user{i}", "password")
+        assert host.session
+        populate(manager, host.session)
+
+    host.scheduler.start()
+    return host
+
+
+async def measure(setup: t.Callable[[int], t.Awaitable[object]], accounts: int) -> t.Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    tasks_before = len(asyncio.all_tasks())
+    timers_before = len(getattr(loop, "_scheduled", ()))
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = await setup(accounts)
+    await asyncio.sleep(0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    measured = {
+        "memory": memory / accounts,
+        "tasks": (len(asyncio.all_tasks()) - tasks_before) / accounts,
+        "timers": (len(getattr(loop, "_scheduled", ())) - timers_before) / accounts,
+    }
+
+    # Release everything before the next setup is measured
+    if isinstance(result, ToshibaAcDeviceHost):
+        await result.shutdown()
+    else:
+        for manager in t.cast(t.List[ToshibaAcDeviceManager], result):
+            await manager.shutdown()
+            # Passed in, so left open by the manager
+            assert manager.session
+            await manager.session.close()
+
+    return measured
+
+
+async def run(accounts: int) -> None:
+    results = {
+        "standalone managers": await measure(standalone, accounts),
+        "shared host": await measure(shared, accounts),
+    }
+
+    print(f"accounts: {accounts}, devices per account: {DEVICES_PER_ACCOUNT}")
+    for name, result in results.items():
+        print(
+            f"{name:<20} memory: {result['memory'] / 1024:7.1f} KiB/account  "
+            f"tasks: {result['tasks']:5.2f}/account  loop timers: {result['timers']:5.2f}/account"
+        )
+
+
+def main() -> None:
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
+
+
+if __name__ == "__main__":
+    main()
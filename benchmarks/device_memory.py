@@ -0,0 +1,163 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory used per ToshibaAcDevice in a synthetic fleet, run with: python -m benchmarks.device_memory [devices]
+
+The same fleet is also measured with every slotted object replaced by an equivalent dict-backed one, which is what
+the device, its state and data classes looked like before they used __slots__.
+"""
+
+import datetime
+import random
+import sys
+import tracemalloc
+import typing as t
+
+from benchmarks.frames import DHW_FRAME, HEATING_FRAME, IDLE_FRAME
+from toshiba_estia.device import ToshibaAcDevice
+from toshiba_estia.device.properties import ToshibaAcDeviceEnergyConsumption
+from toshiba_estia.utils.http_api import EstiaWaterTemperatureInfo, ToshibaAcDeviceInfo
+
+
+def synthetic_fleet(count: int) -> t.List[ToshibaAcDeviceInfo]:
+    rng = random.Random(0)
+    return [
+        ToshibaAcDeviceInfo(
+            ac_id=f"{i:08x}-ac",
+            ac_unique_id=f"{i:08x}-unique",
+            ac_name=f"Estia {i}",
+            initial_ac_state=rng.choice((HEATING_FRAME, DHW_FRAME, IDLE_FRAME)),
+            firmware_version="30.4.11",
+            merit_feature="0",
+            ac_model_id="2",
+        )
+        for i in range(count)
+    ]
+
+
+def create_device(info: ToshibaAcDeviceInfo, rng: random.Random) -> ToshibaAcDevice:
+    device = ToshibaAcDevice(
+        info.ac_name,
+        "benchmark_device",
+        info.ac_id,
+        info.ac_unique_id,
+        info.initial_ac_state,
+        info.firmware_version,
+        info.merit_feature,
+        info.ac_model_id,
+        t.cast(t.Any, None),
+        t.cast(t.Any, None),
+    )
+    device.cdu = "HWT-1101XWHM3W-E"
+    device.fcu = "HWT-1101HW-E"
+    device.serial_number = f"{rng.randrange(10**9):09d}"
+    device.temperatures = EstiaWaterTemperatureInfo(
+        two=rng.randrange(0x60, 0x90),
+        twi=rng.randrange(0x60, 0x90),
+        tho=rng.randrange(0x40, 0x60),
+        to=rng.randrange(0x20, 0x50),
+        tfi=rng.randrange(0x50, 0x70),
+        room_water=0,
+    )
+    device._ac_energy_consumption = ToshibaAcDeviceEnergyConsumption(
+        float(rng.randrange(10**6)), datetime.datetime(2024, 1, 1)
+    )
+    return device
+
+
+DICT_BACKED_CLASSES: t.Dict[type, type] = {}
+
+
+def slot_names(cls: type) -> t.List[str]:
+    return [
+        name
+        for klass in cls.__mro__
+        for name in vars(klass).get("__slots__", ())
+        if name not in ("__dict__", "__weakref__")
+    ]
+
+
+def dict_backed_class(cls: type) -> type:
+    """Copy of a slotted class, and of its slotted bases, storing attributes in an instance __dict__ instead."""
+    if cls in DICT_BACKED_CLASSES:
+        return DICT_BACKED_CLASSES[cls]
+
+    slots = set(vars(cls).get("__slots__", ()))
+    namespace = {
+        name: value
+        for name, value in vars(cls).items()
+        if name not in slots and name not in ("__slots__", "__dict__", "__weakref__")
+    }
+    bases = tuple(dict_backed_class(base) if slot_names(base) else base for base in cls.__bases__)
+    DICT_BACKED_CLASSES[cls] = type(cls.__name__, bases, namespace)
+    return DICT_BACKED_CLASSES[cls]
+
+
+def dict_backed(value: t.Any, memo: t.Dict[int, t.Any]) -> t.Any:
+    """Copy of value with every slotted object replaced by its dict_backed_class, dicts are updated in place."""
+    if id(value) in memo:
+        return memo[id(value)]
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = dict_backed(item, memo)
+        return value
+
+    names = slot_names(type(value))
+    if not names:
+        return value
+
+    copy: t.Any = object.__new__(dict_backed_class(type(value)))
+    memo[id(value)] = copy
+    for name in names:
+        if hasattr(value, name):
+            copy.__dict__[name] = dict_backed(getattr(value, name), memo)
+
+    return copy
+
+
+def measure(
+    infos: t.List[ToshibaAcDeviceInfo], convert: t.Callable[[ToshibaAcDevice], t.Any]
+) -> t.Tuple[int, t.List[t.Any]]:
+    rng = random.Random(1)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    devices = [convert(create_device(info, rng)) for info in infos]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), devices
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    infos = synthetic_fleet(count)
+
+    slotted, devices = measure(infos, lambda device: device)
+    del devices
+    dict_based, devices = measure(infos, lambda device: dict_backed(device, {}))
+    del devices
+
+    print(f"devices: {count}")
+    print(f"dict-backed: {dict_based / 2**20:8.1f} MiB  {dict_based / count:8.1f} B/device")
+    print(f"slotted:     {slotted / 2**20:8.1f} MiB  {slotted / count:8.1f} B/device")
+    print(
+        f"saved:       {(dict_based - slotted) / 2**20:8.1f} MiB  {(dict_based - slotted) / count:8.1f} B/device"
+        f"  ({(dict_based - slotted) / dict_based * 100:.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the lazy, frame backed ToshibaAcFcuState decoder with the former eager struct decoder."""
+
+import struct
+import timeit
+import tracemalloc
+import typing as t
+
+from benchmarks.frames import HEATING_FRAME as SAMPLE_FRAME
+from toshiba_estia.device.fcu_state import ToshibaAcFcuState
+
+
+class EagerFcuState:
+    """Decoder as it was before ToshibaAcFcuState kept the raw frame: every byte unpacked on every update."""
+
+    ENCODING_STRUCT = struct.Struct("B" * 36)
+
+    def __init__(self) -> None:
+        self._status_string = ""
+        self._dhw_is_enabled = 0
+        self._dhw_target_temperature = 0
+        self._new_outdoor_unit_dhw = 0
+        self._new_heating_coil_dhw = 0
+        self._new_heating_active = 0
+        self._water_operation_mode = 0
+        self._zone1_target_temperature = 0
+        self._outdoor_unit_heat = 0
+        self._heating_coil_heat = 0
+        self._ac_outdoor_temperature = 0
+        self._water_pump_status = 0
+
+    def decode(self, hex_state: str) -> None:
+        self._status_string = hex_state
+
+        (
+            self._dhw_is_enabled,
+            self._dhw_target_temperature,
+            self._new_outdoor_unit_dhw,
+            self._new_heating_coil_dhw,
+            self._new_heating_active,
+            self._water_operation_mode,
+            self._zone1_target_temperature,
+            _,
+            self._outdoor_unit_heat,
+            self._heating_coil_heat,
+            self._ac_outdoor_temperature,
+            _,
+            _,
+            _,
+            _,
+            _,
+            _,
+            _,
+            _,
+            self._water_pump_status,
+            *_,
+        ) = self.ENCODING_STRUCT.unpack(bytes.fromhex(hex_state))
+
+    @property
+    def zone1_target_temperature(self) -> float:
+        return (self._zone1_target_temperature - 32) / 2
+
+
+def per_call_ns(stmt: t.Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def bytes_per_state(factory: t.Callable[[], object], count: int = 10_000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    states = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del states
+    return total / count
+
+
+def main() -> None:
+    number = 100_000
+
+    eager = EagerFcuState()
+    lazy = ToshibaAcFcuState()
+
+    # Every device receives its own copy of the frame from the cloud
+    def eager_from_hex() -> EagerFcuState:
+        state = EagerFcuState()
+        state.decode(bytes.fromhex(SAMPLE_FRAME).hex())
+        return state
+
+    def lazy_from_hex() -> ToshibaAcFcuState:
+        return ToshibaAcFcuState.from_hex_state(bytes.fromhex(SAMPLE_FRAME).hex())
+
+    def eager_decode_one_property() -> t.Optional[float]:
+        eager.decode(SAMPLE_FRAME)
+        return eager.zone1_target_temperature
+
+    def lazy_decode_one_property() -> t.Optional[float]:
+        lazy.decode(SAMPLE_FRAME)
+        return lazy.zone1_target_temperature
+
+    results = {
+        "eager decode": per_call_ns(lambda: eager.decode(SAMPLE_FRAME), number),
+        "lazy decode": per_call_ns(lambda: lazy.decode(SAMPLE_FRAME), number),
+        "eager decode + 1 property": per_call_ns(eager_decode_one_property, number),
+        "lazy decode + 1 property": per_call_ns(lazy_decode_one_property, number),
+        "decode_fields (all fields)": per_call_ns(
+            lambda: ToshibaAcFcuState.decode_fields(bytes.fromhex(SAMPLE_FRAME)), number
+        ),
+    }
+
+    for name, ns in results.items():
+        print(f"{name:<28} {ns:8.1f} ns/frame")
+
+    print(f"{'eager state size':<28} {bytes_per_state(eager_from_hex):8.1f} B/device")
+    print(f"{'lazy state size':<28} {bytes_per_state(lazy_from_hex):8.1f} B/device")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory used by the states of a synthetic 10k device fleet with and without frame interning."""
+
+import random
+import tracemalloc
+import typing as t
+
+from toshiba_estia.device.fcu_state import EstiaFrameCache, ToshibaAcFcuState
+
+DEVICES = 10_000
+# Idle units mostly report one of a handful of frames: heating or not, pump on or off, a few target temperatures
+DISTINCT_FRAMES = [
+    f"01{dhw:02x}0000010{mode}{zone:02x}{zone:02x}{heat:02x}002a" + "00" * 8 + f"{heat:02x}" + "00" * 16
+    for dhw in (0x70, 0x7A)
+    for mode in (5, 6)
+    for zone in (0x5C, 0x62, 0x66)
+    for heat in (0, 1)
+]
+
+
+def fleet_bytes(cache: t.Optional[EstiaFrameCache]) -> int:
+    ToshibaAcFcuState.frame_cache = cache
+    rng = random.Random(0)
+    # Every device parses its own copy of the frame, like frames arriving from the cloud do
+    frames = [rng.choice(DISTINCT_FRAMES) for _ in range(DEVICES)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    states = [ToshibaAcFcuState.from_hex_state(frame) for frame in frames]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    ToshibaAcFcuState.frame_cache = None
+    del states
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def main() -> None:
+    plain = fleet_bytes(None)
+    interned = fleet_bytes(EstiaFrameCache(1024))
+
+    print(f"devices: {DEVICES}, distinct frames: {len(DISTINCT_FRAMES)}")
+    print(f"without interning: {plain / 1024:8.1f} KiB ({plain / DEVICES:6.1f} B/device)")
+    print(f"with interning:    {interned / 1024:8.1f} KiB ({interned / DEVICES:6.1f} B/device)")
+    print(f"saved:             {(plain - interned) / 1024:8.1f} KiB ({(1 - interned / plain) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
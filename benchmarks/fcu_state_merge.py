@@ -0,0 +1,57 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the integer mask merge of ToshibaAcFcuState with the former per byte string merge."""
+
+import timeit
+
+from benchmarks.frames import COMPRESSOR_STOPPED_DIFF as SAMPLE_DIFF, HEATING_FRAME as SAMPLE_FRAME
+from toshiba_estia.device.fcu_state import ToshibaAcFcuState
+
+
+def string_merge(input_string: str, state: str) -> str:
+    input_bytes = [input_string[i : i + 2] for i in range(0, len(input_string), 2)]
+    state_bytes = [state[i : i + 2] for i in range(0, len(state), 2)]
+
+    merged_bytes = []
+    for i, input_byte in enumerate(input_bytes):
+        if input_byte.lower() == "ff":
+            merged_bytes.append(state_bytes[i])
+        else:
+            merged_bytes.append(input_byte)
+
+    return "".join(merged_bytes)
+
+
+def main() -> None:
+    number = 100_000
+    state = ToshibaAcFcuState.from_hex_state(SAMPLE_FRAME)
+
+    def string_update() -> None:
+        # Former update(): string merge followed by a full decode
+        state.decode(string_merge(SAMPLE_DIFF, SAMPLE_FRAME))
+
+    results = {
+        "string merge": timeit.repeat(lambda: string_merge(SAMPLE_DIFF, SAMPLE_FRAME), number=number, repeat=5),
+        "mask merge": timeit.repeat(lambda: state.merge(SAMPLE_DIFF, SAMPLE_FRAME), number=number, repeat=5),
+        "string merge + decode": timeit.repeat(string_update, number=number, repeat=5),
+        "update": timeit.repeat(lambda: state.update(SAMPLE_DIFF), number=number, repeat=5),
+    }
+
+    for name, times in results.items():
+        print(f"{name:<24} {min(times) / number * 1e9:8.1f} ns/frame")
+
+
+if __name__ == "__main__":
+    main()
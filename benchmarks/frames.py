@@ -0,0 +1,40 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Realistic Estia frames shared by the benchmarks."""
+
+# Heating zone 1 at 35C, DHW target 45C, compressor running for heating, water pump on
+HEATING_FRAME = "017a0000010666660100" + "2a" + "00" * 8 + "01" + "00" * 16
+# Compressor heating DHW with the electric coil assisting, zone 1 idle
+DHW_FRAME = "017a0101010666660000" + "26" + "00" * 8 + "01" + "00" * 16
+# Everything off
+IDLE_FRAME = "0070000000065c5c0000" + "30" + "00" * 8 + "00" + "00" * 16
+
+# CMD_HDU_FROM_ESTIA payloads: only the changed bytes are set, the rest is 0xFF
+COMPRESSOR_STOPPED_DIFF = "ff" * 8 + "00" + "ff" * 27
+HEATING_TO_DHW_DIFF = "ffff0101ffffffff00ff" + "ff" * 26
+HEARTBEAT_DIFF = "ff" * 36
+
+# Truncated frame with a stray non hex character
+MALFORMED_FRAME = HEATING_FRAME[:40] + "g" + HEATING_FRAME[41:-2]
+
+# CMD_HEARTBEAT_ESTIA payload
+HEARTBEAT_PAYLOAD = {
+    "TFI_temp": "5e",
+    "THO_temp": "50",
+    "TO_temp": "3a",
+    "TWI_temp": "7c",
+    "TWO_temp": "86",
+    "FLO": "8c",
+}
@@ -0,0 +1,124 @@
+# Copyright 2021 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Event loop overhead of periodic device jobs, run with: python -m benchmarks.scheduler [devices]
+
+Compares one sleeping task per device, as periodic_state_reload does on its own, with the timer wheel of
+ToshibaAcScheduler. Intervals are scaled down so that every job runs a few times within the measurement.
+"""
+
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+import typing as t
+
+from toshiba_estia.utils.scheduler import ToshibaAcScheduler
+
+INTERVAL_S = 1.0
+DURATION_S = 3.0
+
+
+def loop_timers(loop: asyncio.AbstractEventLoop) -> int:
+    # Private attribute of the default event loop, only used for reporting
+    return len(getattr(loop, "_scheduled", ()))
+
+
+async def run_tasks(count: int) -> t.Dict[str, float]:
+    runs = 0
+
+    async def job() -> None:
+        nonlocal runs
+        runs += 1
+
+    async def periodic() -> None:
+        await asyncio.sleep(random.uniform(0, INTERVAL_S))
+        while True:
+            await job()
+            await asyncio.sleep(INTERVAL_S)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [asyncio.create_task(periodic()) for _ in range(count)]
+    await asyncio.sleep(0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    timers = loop_timers(asyncio.get_running_loop())
+    cpu = time.process_time()
+    await asyncio.sleep(DURATION_S)
+    cpu = time.process_time() - cpu
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return report(after, before, timers, cpu, runs, len(tasks))
+
+
+async def run_scheduler(count: int) -> t.Dict[str, float]:
+    runs = 0
+
+    async def job() -> None:
+        nonlocal runs
+        runs += 1
+
+    scheduler = ToshibaAcScheduler(tick_s=0.01)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        scheduler.schedule(f"device{i}.state_reload", INTERVAL_S, job)
+    scheduler.start()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    timers = loop_timers(asyncio.get_running_loop())
+    cpu = time.process_time()
+    await asyncio.sleep(DURATION_S)
+    cpu = time.process_time() - cpu
+
+    await scheduler.shutdown()
+
+    return report(after, before, timers, cpu, runs, 0)
+
+
+def report(
+    after: tracemalloc.Snapshot, before: tracemalloc.Snapshot, timers: int, cpu: float, runs: int, tasks: int
+) -> t.Dict[str, float]:
+    memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"memory": memory, "timers": timers, "tasks": tasks, "cpu": cpu, "runs": runs}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    results = {
+        "task per device": asyncio.run(run_tasks(count)),
+        "timer wheel": asyncio.run(run_scheduler(count)),
+    }
+
+    print(f"devices: {count}, interval: {INTERVAL_S}s, measured: {DURATION_S}s")
+    for name, result in results.items():
+        print(
+            f"{name:<16} tasks: {result['tasks']:6.0f}  loop timers: {result['timers']:6.0f}  "
+            f"memory: {result['memory'] / 2**20:6.1f} MiB  "
+            f"cpu: {result['cpu'] / DURATION_S * 100:5.1f}%  "
+            f"per run: {result['cpu'] / max(result['runs'], 1) * 1e6:6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,13 +17,17 @@ from __future__ import annotations
 import asyncio
 import logging
 import struct
+import time
 import typing as t
 from dataclasses import dataclass
 
 from toshiba_estia.device.fcu_state import ToshibaAcFcuState
 from toshiba_estia.device.features import ToshibaAcFeatures
+from toshiba_estia.device.telemetry import EstiaTelemetryBuffer
 from toshiba_estia.device.properties import (
-
+    ToshibaAcDeviceSnapshot,
+    ToshibaAcDeviceValueProvenance,
+    ToshibaAcDeviceValueSource,
     ToshibaAcDeviceEnergyConsumption,
     ToshibaAcMode,
     ToshibaAcStatus,
@@ -32,7 +36,8 @@ from toshiba_estia.device.properties import (
 )
 from toshiba_estia.utils import async_sleep_until_next_multiply_of_minutes, pretty_enum_name, ToshibaAcCallback
 from toshiba_estia.utils.amqp_api import ToshibaAcAmqpApi, JSONSerializable
-from toshiba_estia.utils.http_api import ToshibaAcHttpApi
+from toshiba_estia.utils.scheduler import ToshibaAcScheduledJob, ToshibaAcScheduler
+from toshiba_estia.utils.http_api import EstiaWaterTemperatureInfo, ToshibaAcDeviceAdditionalInfo, ToshibaAcHttpApi
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +47,155 @@ class ToshibaAcDeviceError(Exception):
 
 
 class ToshibaAcDeviceCallback(ToshibaAcCallback["ToshibaAcDevice"]):
-    pass
+    __slots__ = ()
+
+
+# Maps changed property name -> (previous value, current value)
+AttributeChanges = t.Dict[str, t.Tuple[t.Any, t.Any]]
+AttributeCallback = t.Callable[["ToshibaAcDevice", AttributeChanges], t.Optional[t.Awaitable[None]]]
+
+
+class ToshibaAcDeviceSubscription:
+    __slots__ = ("names", "callback")
+
+    def __init__(self, names: t.FrozenSet[str], callback: AttributeCallback) -> None:
+        self.names = names
+        self.callback = callback
 
 
 class ToshibaAcDevice:
     STATE_RELOAD_PERIOD_MINUTES = 30
+    # Devices without AMQP traffic for a whole reload period are reloaded this often instead
+    STATE_RELOAD_SILENT_PERIOD_MINUTES = 10
+    # Devices streaming AMQP messages skip reloads, but are still reloaded at least this often
+    STATE_RELOAD_MAX_AGE_MINUTES = 180
+    # Random delay added to every scheduled reload so that devices do not hit the cloud at once
+    STATE_RELOAD_JITTER_S = 300
+    # Samples kept by the telemetry ring buffer, 0 disables it. 720 heartbeats cover roughly an hour
+    TELEMETRY_CAPACITY = 0
+    # Changes arriving within the window are delivered as one notification, 0 notifies immediately
+    STATE_CHANGE_COALESCE_WINDOW_S = 0.0
+    # Upper bound on how long the first change of a burst may wait for its notification
+    STATE_CHANGE_MAX_LATENCY_S = 2.0
+
+    # Capabilities loaded separately from the mapping, see ready()
+    ADDITIONAL_INFO = "additional_info"
+    ENERGY_CONSUMPTION = "energy_consumption"
+    CONNECTION_STATE = "connection_state"
+    CAPABILITIES = (ADDITIONAL_INFO, ENERGY_CONSUMPTION, CONNECTION_STATE)
+
+    # Names of ToshibaAcDevice properties backed by differently named ToshibaAcFcuState properties
+    FCU_STATE_PROPERTIES = {
+        "zone1_mode": "mode",
+        "water_pump_is_running": "water_pump_status",
+    }
+    HEARTBEAT_PROPERTIES = frozenset(
+        (
+            "tfi_temperature",
+            "tho_temperature",
+            "to_temperature",
+            "twi_temperature",
+            "two_temperature",
+            "water_flow_rate",
+        )
+    )
+    # Heartbeat payload field -> EstiaWaterTemperatureInfo attribute and device property
+    HEARTBEAT_TEMPERATURES = (
+        ("TFI_temp", "tfi", "tfi_temperature"),
+        ("THO_temp", "tho", "tho_temperature"),
+        ("TO_temp", "to", "to_temperature"),
+        ("TWI_temp", "twi", "twi_temperature"),
+        ("TWO_temp", "two", "two_temperature"),
+    )
+    # Heartbeat values moving less than this (C for temperatures) since the last notification are not reported
+    HEARTBEAT_DEADBANDS = {
+        "tfi_temperature": 0.0,
+        "tho_temperature": 0.0,
+        "to_temperature": 0.0,
+        "twi_temperature": 0.0,
+        "two_temperature": 0.0,
+        "water_flow_rate": 0.0,
+    }
+    # Frame fields that also add a telemetry sample when they change between heartbeats
+    TELEMETRY_FCU_STATE_FIELDS = frozenset(
+        ("outdoor_unit_dhw_is_active", "outdoor_unit_heat_is_active", "compressor_status", "water_pump_is_running")
+    )
+    SNAPSHOT_FIELDS = tuple(name for name in ToshibaAcDeviceSnapshot.__dataclass_fields__ if name != "version")
+    # Device properties decoded from the AC state frame
+    FRAME_PROPERTIES = frozenset(
+        (
+            "mode",
+            "ac_outdoor_temperature",
+            "zone1_target_temperature",
+            "dhw_target_temperature",
+            "water_pump_status",
+            "compressor_status",
+            "electric_coil_dhw_is_active",
+            "electric_coil_heat_is_active",
+        )
+    )
+    # Device properties known from the mapping alone
+    MAPPING_PROPERTIES = FRAME_PROPERTIES | frozenset(
+        ("name", "ac_id", "ac_unique_id", "firmware_version", "model_id", "ac_status", "ac_mode", "ac_temperature")
+    )
+    ADDITIONAL_INFO_PROPERTIES = frozenset(("cdu", "fcu", "serial_number", "room_water_temperature")) | (
+        HEARTBEAT_PROPERTIES - {"water_flow_rate"}
+    )
+    # Properties whose changes are reported to subscribers, see subscribe()
+    SUBSCRIBABLE_PROPERTIES = (
+        FRAME_PROPERTIES
+        | HEARTBEAT_PROPERTIES
+        | ADDITIONAL_INFO_PROPERTIES
+        | frozenset(("is_online", "ac_energy_consumption"))
+    )
+
+    __slots__ = (
+        "name",
+        "device_id",
+        "ac_id",
+        "ac_unique_id",
+        "firmware_version",
+        "amqp_api",
+        "http_api",
+        "_is_online",
+        "fcu_state",
+        "_model_id",
+        "cdu",
+        "fcu",
+        "serial_number",
+        "temperatures",
+        "_water_flow_rate",
+        "_malformed_frame_count",
+        "_on_state_changed_callback",
+        "_on_energy_consumption_changed_callback",
+        "_ac_energy_consumption",
+        "periodic_reload_state_task",
+        "periodic_reload_state_job",
+        "state_change_coalesce_window_s",
+        "state_change_max_latency_s",
+        "_changed_fields",
+        "_pending_changes",
+        "_first_pending_change",
+        "_state_changed_handle",
+        "_state_changed_task",
+        "heartbeat_deadbands",
+        "_heartbeat_reported",
+        "_heartbeats_delivered",
+        "_heartbeats_suppressed",
+        "_subscriptions",
+        "_subscribed_values",
+        "telemetry",
+        "_snapshot",
+        "_last_push",
+        "_last_frame",
+        "_last_confirmed_online",
+        "_last_reload",
+        "_state_reloads_skipped",
+        "_provenance",
+        "_ready",
+        "_ready_futures",
+        "__weakref__",
+    )
 
     def __init__(
         self,
@@ -69,52 +218,347 @@ class ToshibaAcDevice:
         self.amqp_api = amqp_api
         self.http_api = http_api
         self._is_online = False
-        self.fcu_state = ToshibaAcFcuState.from_hex_state(initial_ac_state)
         self._model_id = model_id
         self.cdu: t.Optional[str] = None
         self.fcu: t.Optional[str] = None
         self.serial_number: t.Optional[str] = None
+        self.temperatures = EstiaWaterTemperatureInfo(two=0, twi=0, tho=0, to=0, tfi=0, room_water=0)
         self._water_flow_rate: t.Optional[int] = 0
+        self._malformed_frame_count = 0
+
+        # A malformed mapping state must not fail the whole account. The device keeps the fresh state, whose frame
+        # values are all unknown (None or NONE), until a reload or push brings a valid frame.
+        self.fcu_state = ToshibaAcFcuState()
+        initial_diff = ToshibaAcFcuState.parse_frame(initial_ac_state)
+        if initial_diff is None:
+            self.reject_malformed_frame("mapping", initial_ac_state)
+        else:
+            self.fcu_state.update_frame(initial_diff)
 
         self._on_state_changed_callback = ToshibaAcDeviceCallback()
         self._on_energy_consumption_changed_callback = ToshibaAcDeviceCallback()
         self._ac_energy_consumption: t.Optional[ToshibaAcDeviceEnergyConsumption] = None
         self.periodic_reload_state_task: t.Optional[asyncio.Task[None]] = None
+        self.periodic_reload_state_job: t.Optional[ToshibaAcScheduledJob] = None
+
+        self.state_change_coalesce_window_s = self.STATE_CHANGE_COALESCE_WINDOW_S
+        self.state_change_max_latency_s = self.STATE_CHANGE_MAX_LATENCY_S
+        self._changed_fields: t.FrozenSet[str] = frozenset()
+        self._pending_changes: t.Set[str] = set()
+        self._first_pending_change: t.Optional[float] = None
+        self._state_changed_handle: t.Optional[asyncio.TimerHandle] = None
+        self._state_changed_task: t.Optional[asyncio.Task[None]] = None
+
+        # Shared with the class until replaced with a device specific dict
+        self.heartbeat_deadbands: t.Mapping[str, float] = self.HEARTBEAT_DEADBANDS
+        self._heartbeat_reported: t.Dict[str, t.Optional[float]] = {}
+        self._heartbeats_delivered = 0
+        self._heartbeats_suppressed = 0
+
+        # Property name -> subscriptions watching it, and the value subscribers saw last
+        self._subscriptions: t.Dict[str, t.List[ToshibaAcDeviceSubscription]] = {}
+        self._subscribed_values: t.Dict[str, t.Any] = {}
+
+        self.telemetry: t.Optional[EstiaTelemetryBuffer] = None
+        if self.TELEMETRY_CAPACITY:
+            self.enable_telemetry(self.TELEMETRY_CAPACITY)
+
+        self._snapshot: t.Optional[ToshibaAcDeviceSnapshot] = None
+        self.publish_snapshot()
+
+        # time.monotonic() of the last AMQP message, of the last AMQP state frame and of the last HTTP reload, the
+        # mapping state counts as a reload. Heartbeats only prove liveness, state frames may still be lost.
+        self._last_push: t.Optional[float] = None
+        self._last_frame: t.Optional[float] = None
+        self._last_confirmed_online: t.Optional[float] = None
+        self._last_reload = time.monotonic()
+        self._state_reloads_skipped = 0
+
+        self._provenance: t.Dict[str, ToshibaAcDeviceValueProvenance] = {}
+
+        # Capability -> None once loaded or the error of the last failed attempt, futures are created on demand
+        self._ready: t.Dict[str, t.Optional[BaseException]] = {}
+        self._ready_futures: t.Dict[str, asyncio.Future[None]] = {}
+        self.mark_received(
+            self.MAPPING_PROPERTIES if initial_diff is not None else self.MAPPING_PROPERTIES - self.FRAME_PROPERTIES,
+            ToshibaAcDeviceValueSource.MAPPING,
+        )
+
+    async def connect(self, scheduler: t.Optional[ToshibaAcScheduler] = None, periodic_reload: bool = True) -> None:
+        """Load extended info and start reloading state periodically, unless the owner reloads it in bulk."""
+        await self.load_additional_device_info()
 
+        if not periodic_reload:
+            return
 
-    async def connect(self) -> None:
-        await self.load_additional_device_info()
-        self.periodic_reload_state_task = asyncio.get_running_loop().create_task(self.periodic_state_reload())
+        if scheduler is not None:
+            # Namespaced like the jobs of the manager, the same device may be listed by several accounts of a host
+            self.periodic_reload_state_job = scheduler.schedule(
+                f"{self.device_id}.{self.ac_unique_id}.state_reload",
+                self.STATE_RELOAD_SILENT_PERIOD_MINUTES * 60,
+                self.reload_state_if_due,
+                jitter_s=self.STATE_RELOAD_JITTER_S,
+            )
+        else:
+            self.periodic_reload_state_task = asyncio.get_running_loop().create_task(self.periodic_state_reload())
 
     async def shutdown(self) -> None:
+        if self._state_changed_handle:
+            self._state_changed_handle.cancel()
+            self._state_changed_handle = None
+
+        # A coalesced notification already running must not reach callbacks after shutdown either
+        task, self._state_changed_task = self._state_changed_task, None
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        if self.periodic_reload_state_job:
+            job, self.periodic_reload_state_job = self.periodic_reload_state_job, None
+            await job.cancel_and_wait()
+
         if self.periodic_reload_state_task:
             self.periodic_reload_state_task.cancel()
             await self.periodic_reload_state_task
 
     async def load_additional_device_info(self) -> None:
-        additional_info = await self.http_api.get_device_additional_info(self.ac_unique_id)
+        current_state = await self.http_api.get_device_current_state(self.ac_unique_id)
+        self._last_reload = time.monotonic()
+
+        changed = self.apply_http_state(current_state.ac_state)
+        self.apply_additional_info(current_state.additional_info)
+        self.mark_ready(self.ADDITIONAL_INFO)
+
+        await self.state_changed(self.ADDITIONAL_INFO_PROPERTIES | changed)
+
+    async def state_reload(self) -> None:
+        # The state endpoint also serves the extended info, so a reload refreshes water temperatures as well
+        current_state = await self.http_api.get_device_current_state(self.ac_unique_id)
+        self._last_reload = time.monotonic()
+
+        changed = self.apply_http_state(current_state.ac_state) | self.apply_additional_info(
+            current_state.additional_info
+        )
+
+        if changed:
+            await self.state_changed(changed)
+
+    async def handle_bulk_state(self, hex_state: str) -> None:
+        """Apply the state of this device from a fleet-wide mapping response."""
+        self._last_reload = time.monotonic()
+        changed = self.apply_http_state(hex_state)
+
+        if changed:
+            await self.state_changed(changed)
+
+    def apply_http_state(self, hex_state: str) -> t.FrozenSet[str]:
+        logger.debug(f"[{self.name}] AC state from HTTP: {hex_state}")
+
+        diff = ToshibaAcFcuState.parse_frame(hex_state)
+        if diff is None:
+            self.reject_malformed_frame("HTTP", hex_state)
+            return frozenset()
+
+        changed = self.fcu_state.update_frame(diff)
+        self.mark_received(self.frame_properties(diff), ToshibaAcDeviceValueSource.HTTP_RELOAD)
+
+        if changed:
+            logger.debug(f"[{self.name}] Changed by HTTP reload: {', '.join(sorted(changed))}")
+
+        return self.fcu_state_properties(changed)
+
+    def apply_additional_info(self, additional_info: ToshibaAcDeviceAdditionalInfo) -> t.FrozenSet[str]:
+        """Store extended info and return names of the properties whose value changed."""
+        received = self.ADDITIONAL_INFO_PROPERTIES
+        if additional_info.temperatures is None:
+            # Keep the last known temperatures rather than dropping them for a response without them
+            received -= self.HEARTBEAT_PROPERTIES | {"room_water_temperature"}
+
+        old_values = {name: getattr(self, name) for name in received}
+
         self.cdu = additional_info.cdu
         self.fcu = additional_info.fcu
         self.serial_number = additional_info.serial_number
-        self.temperatures = additional_info.temperatures
+        if additional_info.temperatures is not None:
+            self.temperatures = additional_info.temperatures
+            self._heartbeat_reported.clear()
 
-        await self.on_state_changed_callback(self)
+        self.mark_received(received, ToshibaAcDeviceValueSource.ADDITIONAL_INFO)
 
-    async def state_reload(self) -> None:
-        hex_state = await self.http_api.get_device_state(self.ac_unique_id)
-        logger.debug(f"[{self.name}] AC state from HTTP: {hex_state}")
-        if self.fcu_state.update(hex_state):
-            await self.state_changed()
+        return frozenset(name for name, old_value in old_values.items() if getattr(self, name) != old_value)
+
+    def fcu_state_properties(self, fields: t.Iterable[str]) -> t.FrozenSet[str]:
+        """Device properties backed by the given ToshibaAcFcuState properties, frame-only fields are dropped."""
+        return frozenset(self.FCU_STATE_PROPERTIES.get(field, field) for field in fields) & self.FRAME_PROPERTIES
+
+    def frame_properties(self, diff: int) -> t.FrozenSet[str]:
+        """Device properties carried by a state frame or diff."""
+        return self.fcu_state_properties(self.fcu_state.fields_in_frame(diff))
+
+    def mark_received(self, names: t.Iterable[str], source: ToshibaAcDeviceValueSource) -> None:
+        provenance = ToshibaAcDeviceValueProvenance(time.monotonic(), source)
+        for name in names:
+            self._provenance[name] = provenance
+
+    def provenance(
+        self, names: t.Optional[t.Iterable[str]] = None
+    ) -> t.Dict[str, t.Optional[ToshibaAcDeviceValueProvenance]]:
+        """When and from where each property was last received, None for values never received.
+
+        Defaults to every snapshot property. Timestamps are time.monotonic() values.
+        """
+        return {name: self._provenance.get(name) for name in (self.SNAPSHOT_FIELDS if names is None else names)}
+
+    def value_age(self, name: str, now: t.Optional[float] = None) -> t.Optional[float]:
+        """Seconds since the property was last received, None if it never was."""
+        provenance = self._provenance.get(name)
+        if provenance is None:
+            return None
+
+        return (time.monotonic() if now is None else now) - provenance.timestamp
+
+    def snapshot(self) -> ToshibaAcDeviceSnapshot:
+        """Latest published snapshot, safe to read from any thread without locking."""
+        return t.cast(ToshibaAcDeviceSnapshot, self._snapshot)
+
+    def publish_snapshot(self) -> None:
+        # Built completely before the single reference assignment, readers see either the old or the new snapshot
+        version = self._snapshot.version + 1 if self._snapshot else 0
+        self._snapshot = ToshibaAcDeviceSnapshot(
+            version, **{name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+        )
+
+    async def state_changed(self, changed: t.AbstractSet[str] = frozenset()) -> None:
+        self.publish_snapshot()
+        self._pending_changes |= changed
+
+        if self.state_change_coalesce_window_s <= 0:
+            await self.notify_state_changed()
+            return
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if self._first_pending_change is None:
+            self._first_pending_change = now
+
+        # Every change restarts the window, but never past the latency bound of the first pending change
+        deadline = min(
+            now + self.state_change_coalesce_window_s,
+            self._first_pending_change + self.state_change_max_latency_s,
+        )
+
+        if self._state_changed_handle:
+            self._state_changed_handle.cancel()
+
+        self._state_changed_handle = loop.call_at(deadline, self._coalesce_window_expired)
+
+    def _coalesce_window_expired(self) -> None:
+        self._state_changed_handle = None
+        self._state_changed_task = asyncio.get_running_loop().create_task(self._notify_coalesced_state_changed())
+
+    async def _notify_coalesced_state_changed(self) -> None:
+        try:
+            await self.notify_state_changed()
+        except Exception as e:
+            logger.error(f"[{self.name}] State changed callback failed: {e}")
+
+    async def notify_state_changed(self) -> None:
+        """Deliver pending changes to on_state_changed_callback, changed_fields holds their union."""
+        self._changed_fields = frozenset(self._pending_changes)
+        self._pending_changes.clear()
+        self._first_pending_change = None
 
-    async def state_changed(self) -> None:
         logger.info(f"[{self.name}] Current state: {self.fcu_state}")
+
+        if self._subscriptions:
+            await self.notify_subscriptions(self._changed_fields)
+
         await self.on_state_changed_callback(self)
 
+    def subscribe(self, names: t.Union[str, t.Iterable[str]], callback: AttributeCallback) -> t.Callable[[], None]:
+        """Call callback(device, {name: (old, new)}) whenever any of the named properties changes value.
+
+        Only SUBSCRIBABLE_PROPERTIES are accepted. Returns a function removing the subscription.
+        """
+        names = frozenset((names,) if isinstance(names, str) else names)
+
+        unknown = names - self.SUBSCRIBABLE_PROPERTIES
+        if unknown:
+            raise ValueError(f"Cannot subscribe to device properties: {', '.join(sorted(unknown))}")
+
+        subscription = ToshibaAcDeviceSubscription(names, callback)
+
+        for name in names:
+            if name not in self._subscriptions:
+                self._subscriptions[name] = []
+                self._subscribed_values[name] = getattr(self, name)
+            self._subscriptions[name].append(subscription)
+
+        return lambda: self.unsubscribe(subscription)
+
+    def unsubscribe(self, subscription: ToshibaAcDeviceSubscription) -> None:
+        for name in subscription.names:
+            subscriptions = self._subscriptions.get(name)
+            if subscriptions is None or subscription not in subscriptions:
+                continue
+
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscriptions[name]
+                del self._subscribed_values[name]
+
+    async def notify_subscriptions(self, changed: t.AbstractSet[str]) -> None:
+        # Changed properties are reported as candidates, subscribers only hear about values that really moved
+        dispatch: t.Dict[ToshibaAcDeviceSubscription, AttributeChanges] = {}
+
+        for name in changed & self._subscriptions.keys():
+            old = self._subscribed_values[name]
+            new = getattr(self, name)
+
+            if new == old:
+                continue
+
+            self._subscribed_values[name] = new
+            for subscription in self._subscriptions[name]:
+                dispatch.setdefault(subscription, {})[name] = (old, new)
+
+        asyncs = []
+
+        for subscription, changes in dispatch.items():
+            if asyncio.iscoroutinefunction(subscription.callback):
+                asyncs.append(t.cast(t.Awaitable[None], subscription.callback(self, changes)))
+            else:
+                subscription.callback(self, changes)
+
+        await asyncio.gather(*asyncs)
+
+    def state_reload_due(self, now: t.Optional[float] = None) -> bool:
+        """Whether the periodic HTTP reload should run, given how recently the device pushed a state frame over AMQP."""
+        now = time.monotonic() if now is None else now
+
+        if self._last_frame is None or now - self._last_frame >= self.STATE_RELOAD_PERIOD_MINUTES * 60:
+            return True
+
+        # Changes of a streaming device arrive as frames, HTTP only guards against a silently lost one
+        return now - self._last_reload >= self.STATE_RELOAD_MAX_AGE_MINUTES * 60
+
+    async def reload_state_if_due(self) -> None:
+        if not self.state_reload_due():
+            self.skip_state_reload()
+            return
+
+        await self.state_reload()
+
+    def skip_state_reload(self) -> None:
+        self._state_reloads_skipped += 1
+        logger.debug(f"[{self.name}] Skipping state reload, AMQP state frames are recent")
+
     async def periodic_state_reload(self) -> None:
         while True:
-            await async_sleep_until_next_multiply_of_minutes(self.STATE_RELOAD_PERIOD_MINUTES)
+            await async_sleep_until_next_multiply_of_minutes(self.STATE_RELOAD_SILENT_PERIOD_MINUTES)
             try:
-                await self.state_reload()
+                await self.reload_state_if_due()
             except asyncio.CancelledError:
                 raise
             except Exception as e:
@@ -124,48 +568,192 @@ class ToshibaAcDevice:
     async def handle_cmd_hcu_from_estia(self, payload: dict[str, JSONSerializable]) -> None:
         logger.debug(f"Handling Estia HCU command. Payload {payload}")
 
-        if not isinstance(payload["data"], str):
-            logger.error(f'[{self.name}] malformed AC state from AMQP: {payload["data"]}')
+        diff = ToshibaAcFcuState.parse_frame(payload["data"])
+        if diff is None:
+            # A rejected frame must not count as a push, reloads keep covering a broken push channel
+            self.reject_malformed_frame("AMQP", payload["data"])
             return
-        logger.debug(f'[{self.name}] AC state from AMQP: {payload["data"]}')
 
-        if self.fcu_state.update(payload["data"]):
-            logger.info(f"State updated for device_id: {self.ac_unique_id}")
-            await self.state_changed()
+        changed = self.fcu_state.update_frame(diff)
+        self._last_frame = time.monotonic()
+        self.mark_received(self.frame_properties(diff), ToshibaAcDeviceValueSource.AMQP_FRAME)
+        await self.handle_push(ToshibaAcDeviceValueSource.AMQP_FRAME)
+
+        if self.telemetry is not None and not self.TELEMETRY_FCU_STATE_FIELDS.isdisjoint(changed):
+            self.record_telemetry()
+
+        if changed:
+            logger.info(f"State updated for device_id: {self.ac_unique_id}: {', '.join(sorted(changed))}")
+            await self.state_changed(self.fcu_state_properties(changed))
+
+    def reject_malformed_frame(self, source: str, data: object) -> None:
+        # Malformed frames are only counted, a storm of them should not flood the log or raise in the AMQP handler
+        self._malformed_frame_count += 1
+
+        if self._malformed_frame_count == 1:
+            logger.warning(f"[{self.name}] malformed AC state from {source}: {data!r}")
+        else:
+            logger.debug(f"[{self.name}] malformed AC state from {source}: {data!r}")
 
     async def handle_cmd_heartbeat_estia(self, payload: dict[str, t.Any]) -> None:
         logger.debug(f"Handling Estia heartbeat command. Payload {payload}")
 
         try:
-            self.temperatures.tfi = int(payload["TFI_temp"], 16)
-            self.temperatures.tho = int(payload["THO_temp"], 16)
-            self.temperatures.to = int(payload["TO_temp"], 16)
-            self.temperatures.twi = int(payload["TWI_temp"], 16)
-            self.temperatures.two = int(payload["TWO_temp"], 16)
-            self._water_flow_rate = int(payload["FLO"], 16)
+            temperatures = [int(payload[key], 16) for key, _, _ in self.HEARTBEAT_TEMPERATURES]
+            water_flow_rate = int(payload["FLO"], 16)
         except Exception as e:
             logger.error(f"Error converting data exception: '{e}' while converting: '{payload}'")
-            pass
+            return
+
+        await self.handle_push(ToshibaAcDeviceValueSource.HEARTBEAT)
+
+        reported = self._heartbeat_reported
+        for prop in self.HEARTBEAT_PROPERTIES:
+            if prop not in reported:
+                reported[prop] = getattr(self, prop)
+
+        for (_, attr, _), raw in zip(self.HEARTBEAT_TEMPERATURES, temperatures):
+            setattr(self.temperatures, attr, raw)
+        self._water_flow_rate = water_flow_rate
+        self.mark_received(self.HEARTBEAT_PROPERTIES, ToshibaAcDeviceValueSource.HEARTBEAT)
 
-        await self.state_changed()
+        if self.telemetry is not None:
+            self.record_telemetry()
 
-    async def handle_connection_state(self, state: bool) -> None:
+        changed = set()
+        for prop in self.HEARTBEAT_PROPERTIES:
+            value = getattr(self, prop)
+            last = reported[prop]
+
+            if value is None or last is None:
+                moved = value is not last
+            else:
+                moved = abs(value - last) > self.heartbeat_deadbands.get(prop, 0.0)
+
+            if moved:
+                reported[prop] = value
+                changed.add(prop)
+
+        if not changed:
+            self._heartbeats_suppressed += 1
+            return
+
+        self._heartbeats_delivered += 1
+        await self.state_changed(changed)
+
+    def enable_telemetry(self, capacity: int) -> EstiaTelemetryBuffer:
+        """Start keeping the last capacity heartbeat and compressor/pump samples, replacing any earlier buffer."""
+        self.telemetry = EstiaTelemetryBuffer(capacity)
+        return self.telemetry
+
+    def record_telemetry(self, timestamp: t.Optional[float] = None) -> None:
+        if self.telemetry is None:
+            return
+
+        compressor_status = self.compressor_status
+        water_pump_status = self.water_pump_status
+
+        self.telemetry.append(
+            {
+                "tfi_temperature": self.tfi_temperature,
+                "tho_temperature": self.tho_temperature,
+                "to_temperature": self.to_temperature,
+                "twi_temperature": self.twi_temperature,
+                "two_temperature": self.two_temperature,
+                "water_flow_rate": self.water_flow_rate,
+                "compressor_is_running": (
+                    None
+                    if compressor_status in (None, EstiaCompressorStatus.NONE)
+                    else int(compressor_status in (EstiaCompressorStatus.DHW, EstiaCompressorStatus.HEAT))
+                ),
+                "water_pump_is_running": int(water_pump_status) if water_pump_status is not None else None,
+            },
+            timestamp,
+        )
+
+    async def handle_push(self, source: ToshibaAcDeviceValueSource) -> None:
+        # Any AMQP message proves the device is connected, no need to wait for the next connection poll
+        self._last_push = time.monotonic()
+
+        if not self._is_online:
+            await self.handle_connection_state(True, source)
+
+    def silent_for(self, now: t.Optional[float] = None) -> float:
+        """Seconds since the device was last heard from over AMQP or confirmed online over HTTP."""
+        last_seen = max(self._last_push or 0.0, self._last_confirmed_online or 0.0)
+        return (time.monotonic() if now is None else now) - last_seen
+
+    def ready(self, capability: str) -> asyncio.Future[None]:
+        """Future resolved once the capability has been loaded, or failed with the error that prevented it."""
+        if capability not in self.CAPABILITIES:
+            raise ToshibaAcDeviceError(f"Unknown device capability: {capability}")
+
+        future = self._ready_futures.get(capability)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._ready_futures[capability] = future
+
+            if capability in self._ready:
+                self._resolve_ready(future, self._ready[capability])
+
+        return future
+
+    def is_ready(self, capability: str) -> bool:
+        return capability in self._ready and self._ready[capability] is None
+
+    def mark_ready(self, capability: str, error: t.Optional[BaseException] = None) -> None:
+        # A later success replaces an earlier failure, the first success is final
+        if self.is_ready(capability):
+            return
+
+        self._ready[capability] = error
+
+        future = self._ready_futures.get(capability)
+        if future is not None:
+            if future.done():
+                # Only failures are replaced, await ready() again for the new outcome
+                future = asyncio.get_running_loop().create_future()
+                self._ready_futures[capability] = future
+            self._resolve_ready(future, error)
+
+    @staticmethod
+    def _resolve_ready(future: asyncio.Future[None], error: t.Optional[BaseException]) -> None:
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+    async def handle_connection_state(
+        self, state: bool, source: ToshibaAcDeviceValueSource = ToshibaAcDeviceValueSource.CONNECTION_STATE
+    ) -> None:
         logger.debug(f"Handling Estia connection state. Is online={state}")
+        self.mark_received(("is_online",), source)
+
+        if state and source == ToshibaAcDeviceValueSource.CONNECTION_STATE:
+            self._last_confirmed_online = time.monotonic()
+
+        self.mark_ready(self.CONNECTION_STATE)
 
         if self._is_online == state:
             return
 
         self._is_online = state
-        await self.state_changed()
+        await self.state_changed({"is_online"})
 
 
     async def handle_update_ac_energy_consumption(self, val: ToshibaAcDeviceEnergyConsumption) -> None:
+        self.mark_received(("ac_energy_consumption",), ToshibaAcDeviceValueSource.ENERGY_CONSUMPTION)
+        self.mark_ready(self.ENERGY_CONSUMPTION)
 
         if self._ac_energy_consumption != val:
             self._ac_energy_consumption = val
+            self.publish_snapshot()
 
             logger.debug(f"[{self.name}] New energy consumption: {val.energy_wh}Wh")
 
+            if self._subscriptions:
+                await self.notify_subscriptions({"ac_energy_consumption"})
+
             await self.on_energy_consumption_changed_callback(self)
 
     async def send_state_to_ac(self, state: ToshibaAcFcuState) -> None:
@@ -195,7 +783,7 @@ class ToshibaAcDevice:
         await self.send_state_to_ac(state)
 
     @property
-    def ac_temperature(self) -> t.Optional[int]:
+    def ac_temperature(self) -> t.Optional[float]:
         ret = self.fcu_state.ac_temperature
 
         return ret
@@ -210,39 +798,39 @@ class ToshibaAcDevice:
         return self.fcu_state.ac_indoor_temperature
 
     @property
-    def ac_outdoor_temperature(self) -> t.Optional[int]:
+    def ac_outdoor_temperature(self) -> t.Optional[float]:
         return self.fcu_state.ac_outdoor_temperature
 
     @property
-    def zone1_target_temperature(self) -> t.Optional[int]:
+    def zone1_target_temperature(self) -> t.Optional[float]:
         return self.fcu_state.zone1_target_temperature
 
     @property
-    def dhw_target_temperature(self) -> t.Optional[int]:
+    def dhw_target_temperature(self) -> t.Optional[float]:
         return self.fcu_state.dhw_target_temperature
 
     @property
-    def twi_temperature(self) -> t.Optional[int] | None:
+    def twi_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.twi)
 
     @property
-    def two_temperature(self) -> t.Optional[int] | None:
+    def two_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.two)
 
     @property
-    def tho_temperature(self) -> t.Optional[int] | None:
+    def tho_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.tho)
 
     @property
-    def to_temperature(self) -> t.Optional[int] | None:
+    def to_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.to)
 
     @property
-    def tfi_temperature(self) -> t.Optional[int] | None:
+    def tfi_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.tfi)
 
     @property
-    def room_water_temperature(self) -> t.Optional[int] | None:
+    def room_water_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.EstiaTemperature.from_raw(self.temperatures.room_water)
 
     @property
@@ -269,6 +857,37 @@ class ToshibaAcDevice:
     def ac_energy_consumption(self) -> t.Optional[ToshibaAcDeviceEnergyConsumption]:
         return self._ac_energy_consumption
 
+    @property
+    def changed_fields(self) -> t.FrozenSet[str]:
+        """Properties changed since the previous on_state_changed_callback notification."""
+        return self._changed_fields
+
+    @property
+    def heartbeats_delivered(self) -> int:
+        return self._heartbeats_delivered
+
+    @property
+    def heartbeats_suppressed(self) -> int:
+        return self._heartbeats_suppressed
+
+    @property
+    def last_push(self) -> t.Optional[float]:
+        """time.monotonic() of the last AMQP message from the device."""
+        return self._last_push
+
+    @property
+    def last_frame(self) -> t.Optional[float]:
+        """time.monotonic() of the last AMQP state frame from the device."""
+        return self._last_frame
+
+    @property
+    def state_reloads_skipped(self) -> int:
+        return self._state_reloads_skipped
+
+    @property
+    def malformed_frame_count(self) -> int:
+        return self._malformed_frame_count
+
     @property
     def is_online(self) -> t.Optional[bool]:
         return self._is_online
@@ -0,0 +1,112 @@
+# Copyright 2022 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorized decoding of many Estia state frames at once, requires the optional numpy dependency."""
+
+from __future__ import annotations
+
+import typing as t
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("Batch decoding of Estia frames requires numpy, install toshiba-estia[numpy]") from e
+
+from toshiba_estia.device.fcu_state import ToshibaAcFcuState
+from toshiba_estia.device.properties import EstiaCompressorStatus
+
+
+def frames_to_array(
+    frames: t.Sequence[str] | np.ndarray, state_class: t.Type[ToshibaAcFcuState] = ToshibaAcFcuState
+) -> np.ndarray:
+    """Convert hex frames (or an existing 2-D uint8 array) to a (frames, FRAME_SIZE) uint8 array."""
+    if isinstance(frames, np.ndarray):
+        if frames.ndim != 2 or frames.shape[1] != state_class.FRAME_SIZE or frames.dtype != np.uint8:
+            raise ValueError(f"Expected a (N, {state_class.FRAME_SIZE}) uint8 array, got {frames.shape} {frames.dtype}")
+        return frames
+
+    hex_size = 2 * state_class.FRAME_SIZE
+    if any(len(frame) != hex_size for frame in frames):
+        raise ValueError(f"Every frame must be {hex_size} hex characters long")
+
+    data = np.frombuffer(bytes.fromhex("".join(frames)), dtype=np.uint8)
+    return data.reshape(len(frames), state_class.FRAME_SIZE)
+
+
+def _table_array(table: t.Sequence[t.Any]) -> np.ndarray:
+    # Unknown values (None) of numeric tables become NaN, so that their columns stay numeric
+    known = [value for value in table if value is not None]
+    if len(known) < len(table) and all(isinstance(value, (bool, int, float)) for value in known):
+        return np.array([np.nan if value is None else value for value in table], dtype=float)
+    return np.asarray(table)
+
+
+def _compressor_status(columns: t.Dict[str, np.ndarray]) -> np.ndarray:
+    dhw = columns["outdoor_unit_dhw_is_active"]
+    heat = columns["outdoor_unit_heat_is_active"]
+    return np.where(
+        dhw == 1,
+        EstiaCompressorStatus.DHW,
+        np.where(
+            heat == 1,
+            EstiaCompressorStatus.HEAT,
+            np.where(np.isnan(dhw) | np.isnan(heat), EstiaCompressorStatus.NONE, EstiaCompressorStatus.OFF),
+        ),
+    )
+
+
+# Vectorized counterparts of ToshibaAcFcuState.DERIVED_FIELDS
+DERIVED_COLUMNS: t.Dict[str, t.Callable[[t.Dict[str, np.ndarray]], np.ndarray]] = {
+    "compressor_status": _compressor_status,
+}
+
+
+def decode_frames(
+    frames: t.Sequence[str] | np.ndarray, state_class: t.Type[ToshibaAcFcuState] = ToshibaAcFcuState
+) -> t.Dict[str, np.ndarray]:
+    """Decode every field of many frames, one column per ToshibaAcFcuState property.
+
+    Single byte fields are decoded by indexing a numpy copy of the field's lookup table with the whole byte column,
+    so values match the scalar properties exactly. Numeric fields give numeric columns, enums give object columns.
+    Unknown values, None on the scalar properties, are NaN in numeric columns.
+    """
+    data = frames_to_array(frames, state_class)
+    columns: t.Dict[str, np.ndarray] = {}
+
+    for name, field in state_class.FRAME_LAYOUT.items():
+        if field.table is not None:
+            columns[name] = _table_array(field.table)[data[:, field.offset]]
+        else:
+            raw = np.ascontiguousarray(data[:, field.offset : field.offset + field.width])
+            raw_values = raw.view(f">u{field.width}").ravel()
+            columns[name] = np.frompyfunc(field.convert, 1, 1)(raw_values)
+
+    for name, derive in DERIVED_COLUMNS.items():
+        if name in state_class.DERIVED_FIELDS:
+            columns[name] = derive(columns)
+
+    return columns
+
+
+def decode_frames_structured(
+    frames: t.Sequence[str] | np.ndarray, state_class: t.Type[ToshibaAcFcuState] = ToshibaAcFcuState
+) -> np.ndarray:
+    """Same as decode_frames, packed into a structured array with one record per frame."""
+    columns = decode_frames(frames, state_class)
+    records = np.empty(len(next(iter(columns.values()))), dtype=[(name, col.dtype) for name, col in columns.items()])
+
+    for name, column in columns.items():
+        records[name] = column
+
+    return records
@@ -14,9 +14,11 @@
 
 from __future__ import annotations
 
+import logging
+import re
 import struct
 import typing as t
-import logging
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -28,75 +30,340 @@ from toshiba_estia.device.properties import (
 )
 
 
+T = t.TypeVar("T")
+
+
+def _lookup_table(known: t.Mapping[int, T], unknown: T) -> t.Tuple[T, ...]:
+    # Raw codes missing from known decode to unknown instead of raising KeyError
+    return tuple(known.get(raw, unknown) for raw in range(0x100))
+
+
+# Conversion tables indexed by the raw byte value, built once at import time.
+# NONE_VAL (0xFF) marks a byte that is not known yet (a fresh state) and decodes to None, not to a real value.
+_AC_TEMPERATURE_FROM_RAW = (*((raw - 32) / 2 for raw in range(0xFF)), None)
+_ESTIA_TEMPERATURE_FROM_RAW = (None, *((raw - 48) / 2 for raw in range(1, 0x100)))
+_ESTIA_WATER_MODE_FROM_RAW = _lookup_table(
+    {
+        0x5: EstiaWaterMode.COOL,
+        0x6: EstiaWaterMode.HEAT,
+        0x0: EstiaWaterMode.NONE,
+        # AUTO is unknown value
+    },
+    EstiaWaterMode.NONE,
+)
+_AC_STATUS_FROM_RAW = _lookup_table(
+    {
+        0x30: ToshibaAcStatus.ON,
+        0x31: ToshibaAcStatus.OFF,
+        0x02: ToshibaAcStatus.NONE,
+        0xFF: ToshibaAcStatus.NONE,
+    },
+    ToshibaAcStatus.NONE,
+)
+_AC_STATUS_TO_RAW = {
+    ToshibaAcStatus.ON: 0x30,
+    ToshibaAcStatus.OFF: 0x31,
+    ToshibaAcStatus.NONE: 0xFF,
+}
+_AC_MODE_FROM_RAW = _lookup_table(
+    {
+        0x41: ToshibaAcMode.AUTO,
+        0x42: ToshibaAcMode.COOL,
+        0x43: ToshibaAcMode.HEAT,
+        0x00: ToshibaAcMode.NONE,
+        0xFF: ToshibaAcMode.NONE,
+    },
+    ToshibaAcMode.NONE,
+)
+_FLAG_FROM_RAW = (*(bool(raw) for raw in range(0xFF)), None)
+_AC_MODE_TO_RAW = {
+    ToshibaAcMode.AUTO: 0x41,
+    ToshibaAcMode.COOL: 0x42,
+    ToshibaAcMode.HEAT: 0x43,
+    ToshibaAcMode.NONE: 0xFF,
+}
+
+
+def _fields_by_byte(field_bytes: t.Dict[str, t.Tuple[int, ...]], size: int) -> t.Tuple[t.Tuple[str, ...], ...]:
+    return tuple(tuple(name for name, offsets in field_bytes.items() if offset in offsets) for offset in range(size))
+
+
+def _compile_decoder(
+    layout: t.Sequence[EstiaFrameField[t.Any]], decode_struct: struct.Struct
+) -> t.Callable[[bytes], t.Dict[str, t.Any]]:
+    # Generates straight line code unpacking the frame once and converting every field with its own table
+    namespace: t.Dict[str, t.Any] = {"unpack": decode_struct.unpack}
+    raw_names = []
+    values = []
+
+    for i, field in enumerate(layout):
+        raw_names.append(f"r{i}")
+        if field.table is not None:
+            namespace[f"c{i}"] = field.table
+            values.append(f"{field.name!r}: c{i}[r{i}]")
+        else:
+            namespace[f"c{i}"] = field.convert
+            values.append(f"{field.name!r}: c{i}(r{i})")
+
+    source = (
+        "def decode_fields(frame):\n"
+        f"    ({''.join(name + ', ' for name in raw_names)}) = unpack(frame)\n"
+        f"    return {{{', '.join(values)}}}\n"
+    )
+    exec(source, namespace)
+
+    return t.cast(t.Callable[[bytes], t.Dict[str, t.Any]], namespace["decode_fields"])
+
+
+class EstiaFrameField(t.Generic[T]):
+    """Field of the Estia state frame, decoded from the frame on every access.
+
+    converter is either a table indexed by the raw value or a callable, callables of single byte fields are
+    turned into a table when the field is created. Fields with to_raw can be written and encoded into diffs.
+    ToshibaAcFcuState replaces its fields with properties built by compile_property when the class is created.
+    """
+
+    def __init__(
+        self,
+        offset: int,
+        converter: t.Sequence[T] | t.Callable[[int], T],
+        to_raw: t.Optional[t.Callable[[T], int]] = None,
+        width: int = 1,
+    ) -> None:
+        self.name = ""
+        self.offset = offset
+        self.width = width
+        self.to_raw = to_raw
+        self.table: t.Optional[t.Sequence[T]] = None
+        self.convert: t.Optional[t.Callable[[int], T]] = None
+
+        if not callable(converter):
+            if width != 1:
+                raise ValueError("Lookup table converters are only supported for single byte fields")
+            self.table = converter
+        elif width == 1:
+            self.table = tuple(converter(raw) for raw in range(0x100))
+        else:
+            self.convert = converter
+
+    @property
+    def writable(self) -> bool:
+        return self.to_raw is not None
+
+    @property
+    def offsets(self) -> t.Tuple[int, ...]:
+        return tuple(range(self.offset, self.offset + self.width))
+
+    @property
+    def struct_format(self) -> str:
+        return {1: "B", 2: "H", 4: "I"}[self.width]
+
+    def from_raw(self, raw: int) -> T:
+        if self.table is not None:
+            return self.table[raw]
+        return t.cast(t.Callable[[int], T], self.convert)(raw)
+
+    def compile_property(self) -> property:
+        """Build the property the field is replaced with on its class, specialized for its offset and converter."""
+        offset = self.offset
+        end = self.offset + self.width
+        width = self.width
+        convert = self.convert
+        to_raw = self.to_raw
+
+        if self.table is not None:
+            # Bound before the closure is built, so that it indexes a table that is known not to be None
+            table: t.Sequence[T] = self.table
+
+            def fget(state: ToshibaAcFcuState) -> T:
+                return table[state._frame[offset]]
+
+        else:
+
+            def fget(state: ToshibaAcFcuState) -> T:
+                return t.cast(t.Callable[[int], T], convert)(int.from_bytes(state._frame[offset:end], "big"))
+
+        if to_raw is None:
+            return property(fget)
+
+        def fset(state: ToshibaAcFcuState, val: T) -> None:
+            state._set_bytes(offset, to_raw(val).to_bytes(width, "big"))
+
+        return property(fget, fset)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @t.overload
+    def __get__(self, state: None, owner: t.Any) -> EstiaFrameField[T]: ...
+
+    @t.overload
+    def __get__(self, state: ToshibaAcFcuState, owner: t.Any) -> T: ...
+
+    def __get__(self, state: t.Optional[ToshibaAcFcuState], owner: t.Any) -> EstiaFrameField[T] | T:
+        if state is None:
+            return self
+
+        return self.from_raw(int.from_bytes(state._frame[self.offset : self.offset + self.width], "big"))
+
+    def __set__(self, state: ToshibaAcFcuState, val: T) -> None:
+        if self.to_raw is None:
+            raise AttributeError(f"{self.name} is read only")
+
+        state._set_bytes(self.offset, self.to_raw(val).to_bytes(self.width, "big"))
+
+
+class EstiaFrameCache:
+    """LRU bounded pool of frames, states holding equal frames share a single bytes object from the pool."""
+
+    __slots__ = ("max_size", "_frames")
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._frames: OrderedDict[bytes, bytes] = OrderedDict()
+
+    def intern(self, frame: bytes) -> bytes:
+        cached = self._frames.get(frame)
+
+        if cached is not None:
+            self._frames.move_to_end(frame)
+            return cached
+
+        self._frames[frame] = frame
+        if len(self._frames) > self.max_size:
+            self._frames.popitem(last=False)
+
+        return frame
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
 class ToshibaAcFcuState:
     NONE_VAL = 0xFF
     NONE_VAL_HALF = 0x0F
     NONE_VAL_SIGNED = -1
-    ENCODING_STRUCT = struct.Struct("BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB")
+    FRAME_SIZE = 36
+
+    __slots__ = ("_ac_status", "_ac_mode", "_ac_temperature", "_ac_indoor_temperature", "_frame")
+
+    # Properties computed from several frame fields
+    DERIVED_FIELDS = {
+        "compressor_status": ("outdoor_unit_dhw_is_active", "outdoor_unit_heat_is_active"),
+    }
+
+    # Compiled from the frame fields of the class, see _compile_frame_layout
+    FRAME_LAYOUT: t.Dict[str, EstiaFrameField[t.Any]] = {}
+    FIELD_BYTES: t.Dict[str, t.Tuple[int, ...]] = {}
+    _BYTE_FIELDS: t.Tuple[t.Tuple[str, ...], ...] = ()
+    _DECODE_STRUCT = struct.Struct("")
+    _decode_fields: t.Callable[[bytes], t.Dict[str, t.Any]]
+
+    # Set to an EstiaFrameCache to share identical frames between states
+    frame_cache: t.Optional[EstiaFrameCache] = None
+    _BLANK_FRAME = b"\xff" * FRAME_SIZE
+    _HEX_FRAME = re.compile(f"[0-9a-fA-F]{{{2 * FRAME_SIZE}}}")
+
+    _FRAME_ALL_BITS = int.from_bytes(b"\xff" * FRAME_SIZE, "big")
+    _FRAME_LOW_BITS = int.from_bytes(b"\x7f" * FRAME_SIZE, "big")
+    _FRAME_HIGH_BITS = int.from_bytes(b"\x80" * FRAME_SIZE, "big")
 
     class AcTemperature:
         @staticmethod
-        def from_raw(raw: int) -> t.Optional[int]:
+        def from_raw(raw: int) -> t.Optional[float]:
+            if 0 <= raw < 0x100:
+                return _AC_TEMPERATURE_FROM_RAW[raw]
             return (raw - 32) / 2
 
+        @staticmethod
+        def to_raw(val: t.Optional[float]) -> int:
+            if val is None:
+                return ToshibaAcFcuState.NONE_VAL
+            return int(val * 2 + 32)
+
     class EstiaTemperature:
         @staticmethod
-        def from_raw(raw: int) -> t.Optional[int] | None:
-            if raw == 0:
-                return None
-            else:
-                return (raw - 48) / 2
+        def from_raw(raw: int) -> t.Optional[float]:
+            if 0 <= raw < 0x100:
+                return _ESTIA_TEMPERATURE_FROM_RAW[raw]
+            return (raw - 48) / 2
 
     class EstiaWaterMode:
         @staticmethod
         def from_raw(raw: int) -> EstiaWaterMode:
-            return {
-                0x5: EstiaWaterMode.COOL,
-                0x6: EstiaWaterMode.HEAT,
-                0x0: EstiaWaterMode.NONE,
-                # AUTO is unknown value
-            }[raw]
+            return _ESTIA_WATER_MODE_FROM_RAW[raw]
 
     class AcStatus:
         @staticmethod
         def from_raw(raw: int) -> ToshibaAcStatus:
-            return {
-                0x30: ToshibaAcStatus.ON,
-                0x31: ToshibaAcStatus.OFF,
-                0x02: ToshibaAcStatus.NONE,
-                ToshibaAcFcuState.NONE_VAL: ToshibaAcStatus.NONE,
-            }[raw]
+            return _AC_STATUS_FROM_RAW[raw]
 
         @staticmethod
         def to_raw(status: ToshibaAcStatus) -> int:
-            return {
-                ToshibaAcStatus.ON: 0x30,
-                ToshibaAcStatus.OFF: 0x31,
-                ToshibaAcStatus.NONE: ToshibaAcFcuState.NONE_VAL,
-            }[status]
+            return _AC_STATUS_TO_RAW[status]
 
     class AcMode:
         @staticmethod
         def from_raw(raw: int) -> ToshibaAcMode:
-            return {
-                0x41: ToshibaAcMode.AUTO,
-                0x42: ToshibaAcMode.COOL,
-                0x43: ToshibaAcMode.HEAT,
-                0x00: ToshibaAcMode.NONE,
-                ToshibaAcFcuState.NONE_VAL: ToshibaAcMode.NONE,
-            }[raw]
+            return _AC_MODE_FROM_RAW[raw]
 
         @staticmethod
         def to_raw(mode: ToshibaAcMode) -> int:
-            return {
-                ToshibaAcMode.AUTO: 0x41,
-                ToshibaAcMode.COOL: 0x42,
-                ToshibaAcMode.HEAT: 0x43,
-                ToshibaAcMode.NONE: ToshibaAcFcuState.NONE_VAL,
-            }[mode]
+            return _AC_MODE_TO_RAW[mode]
+
+    # Estia state frame layout
+    dhw_is_enabled = EstiaFrameField(0, _FLAG_FROM_RAW)
+    dhw_target_temperature = EstiaFrameField(1, _AC_TEMPERATURE_FROM_RAW, AcTemperature.to_raw)
+    outdoor_unit_dhw_is_active = EstiaFrameField(2, _FLAG_FROM_RAW)
+    electric_coil_dhw_is_active = EstiaFrameField(3, _FLAG_FROM_RAW)
+    water_function_is_active = EstiaFrameField(4, _FLAG_FROM_RAW)
+    zone1_mode = EstiaFrameField(5, _ESTIA_WATER_MODE_FROM_RAW)
+    zone1_target_temperature = EstiaFrameField(6, _AC_TEMPERATURE_FROM_RAW, AcTemperature.to_raw)
+    # Byte 7 - Old heating target temperature
+    outdoor_unit_heat_is_active = EstiaFrameField(8, _FLAG_FROM_RAW)
+    electric_coil_heat_is_active = EstiaFrameField(9, _FLAG_FROM_RAW)
+    ac_outdoor_temperature = EstiaFrameField(10, _AC_TEMPERATURE_FROM_RAW, AcTemperature.to_raw)
+    water_pump_is_running = EstiaFrameField(19, _FLAG_FROM_RAW)
+
+    def __init_subclass__(cls, **kwargs: t.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._compile_frame_layout()
+
+    @classmethod
+    def _compile_frame_layout(cls) -> None:
+        # Start from the layout inherited from the base class, fields declared on cls add to or replace it
+        fields = dict(cls.FRAME_LAYOUT)
+        for name, value in list(vars(cls).items()):
+            if isinstance(value, EstiaFrameField):
+                fields[name] = value
+                setattr(cls, name, value.compile_property())
+
+        layout = dict(sorted(fields.items(), key=lambda item: item[1].offset))
+
+        struct_format = ">"
+        position = 0
+        for field in layout.values():
+            if field.offset < position or field.offset + field.width > cls.FRAME_SIZE:
+                raise ValueError(f"Field {field.name} at byte {field.offset} does not fit the frame layout")
+            struct_format += "x" * (field.offset - position) + field.struct_format
+            position = field.offset + field.width
+        struct_format += "x" * (cls.FRAME_SIZE - position)
+
+        field_bytes = {field.name: field.offsets for field in layout.values()}
+        for name, sources in cls.DERIVED_FIELDS.items():
+            field_bytes[name] = tuple(offset for source in sources for offset in field_bytes[source])
+
+        cls.FRAME_LAYOUT = layout
+        cls.FIELD_BYTES = field_bytes
+        cls._BYTE_FIELDS = _fields_by_byte(field_bytes, cls.FRAME_SIZE)
+        cls._DECODE_STRUCT = struct.Struct(struct_format)
+        cls._decode_fields = staticmethod(_compile_decoder(tuple(layout.values()), cls._DECODE_STRUCT))
 
     @classmethod
-    def from_hex_state(cls, hex_state: str) -> ToshibaAcFcuState:
+    def from_hex_state(cls, hex_state: str | bytes) -> ToshibaAcFcuState:
         state = cls()
         state.decode(hex_state)
         return state
@@ -106,88 +373,114 @@ class ToshibaAcFcuState:
         self._ac_mode = ToshibaAcFcuState.NONE_VAL
         self._ac_temperature = ToshibaAcFcuState.NONE_VAL_SIGNED
 
-        # Status string
-        self._status_string = ""
+        # Raw Estia frame, fields are decoded on access. Bytes that were never set are "don't care".
+        # The frame is immutable so that it can be shared through frame_cache, changes replace it.
+        self._frame = self._BLANK_FRAME
 
-        # New world order
-        self._dhw_is_enabled = 0
-        self._dhw_target_temperature = 0
-        self._new_outdoor_unit_dhw = 0
-        self._new_heating_coil_dhw = 0
-        self._new_heating_active = 0
-        self._water_operation_mode = 0
+    @property
+    def _status_string(self) -> str:
+        return self._frame.hex()
 
-        self._zone1_target_temperature = 0
+    def encode(self) -> str:
+        return self._frame.hex()
 
-        self._outdoor_unit_heat = 0
-        self._heating_coil_heat = 0
+    @classmethod
+    def encode_diff(cls, values: t.Mapping[str, t.Any]) -> str:
+        """Encode a state diff that changes only the given writable fields."""
+        state = cls()
+        for name, val in values.items():
+            setattr(state, name, val)
+        return state.encode()
 
-        self._water_pump_status = 0
+    @classmethod
+    def decode_fields(cls, frame: bytes) -> t.Dict[str, t.Any]:
+        """Decode every field of a raw frame at once."""
+        return cls._decode_fields(frame)
 
-    def encode(self) -> str:
-        return ""
-
-    def decode(self, hex_state: str) -> None:
-
-        self._status_string = hex_state
-
-        data = self.ENCODING_STRUCT.unpack(bytes.fromhex(hex_state))
-        (
-            self._dhw_is_enabled,              # Byte 1 - DHW function enabled
-            self._dhw_target_temperature,      # Byte 2 - DHW Target temperature
-            self._new_outdoor_unit_dhw,        # Byte 3 - Outdoor unit active for DHW
-            self._new_heating_coil_dhw,        # Byte 4 - Heater coils active for DHW
-            self._new_heating_active,          # Byte 5 - Water function activated
-            self._water_operation_mode,        # Byte 6 - Operation mode - Heat/Cool/Auto
-            self._zone1_target_temperature,    # Byte 7 - Heating Target temperature
-            _,                                 # Byte 8 - Old heating target temperature
-            self._outdoor_unit_heat,           # Byte 9 - Outdoor unit active for heating
-            self._heating_coil_heat,           # Byte 10 - Heating coil active for heating
-            self._ac_outdoor_temperature,      # Byte 11
-            _,                                 # Byte 12
-            _,                                 # Byte 13
-            _,                                 # Byte 14
-            _,                                 # Byte 15
-            _,                                 # Byte 16
-            _,                                 # Byte 17
-            _,                                 # Byte 18
-            _,                                 # Byte 19
-            self._water_pump_status,           # Byte 20 - Water pump status
-            *_,
-        ) = data
+    @classmethod
+    def parse_frame(cls, data: object) -> t.Optional[int]:
+        """Validate a hex string or raw bytes frame and return it as a big integer, None when it is malformed."""
+        if isinstance(data, str):
+            if cls._HEX_FRAME.fullmatch(data) is None:
+                return None
+            return int(data, 16)
+
+        if isinstance(data, (bytes, bytearray, memoryview)) and len(data) == cls.FRAME_SIZE:
+            return int.from_bytes(data, "big")
+
+        return None
+
+    def decode(self, hex_state: str | bytes) -> None:
+        if isinstance(hex_state, str):
+            if self._HEX_FRAME.fullmatch(hex_state) is None:
+                raise ValueError(f"Malformed state: {hex_state!r}")
+            frame = bytes.fromhex(hex_state)
+        elif len(hex_state) == self.FRAME_SIZE:
+            frame = bytes(hex_state)
+        else:
+            raise ValueError(f"Expected {self.FRAME_SIZE} bytes of state, got {len(hex_state)}")
+
+        self._set_frame(frame)
+
+    def _set_frame(self, frame: bytes) -> None:
+        if self.frame_cache is not None:
+            frame = self.frame_cache.intern(frame)
+        self._frame = frame
+
+    def _set_bytes(self, offset: int, data: bytes) -> None:
+        self._set_frame(self._frame[:offset] + data + self._frame[offset + len(data) :])
+
+    @classmethod
+    def merge_frames(cls, diff: int, state: int) -> int:
+        # Frames are handled as big integers, bytes set to NONE_VAL in diff keep the value from state
+        inverted = diff ^ cls._FRAME_ALL_BITS
+        # Highest bit of every byte is set when that byte of diff is not NONE_VAL
+        not_none = (((inverted & cls._FRAME_LOW_BITS) + cls._FRAME_LOW_BITS) | inverted) & cls._FRAME_HIGH_BITS
+        diff_mask = (not_none >> 7) * cls.NONE_VAL
+
+        return (diff & diff_mask) | (state & ~diff_mask & cls._FRAME_ALL_BITS)
 
     def merge(self, input_string: str, state: str) -> str:
+        merged = self.merge_frames(int(input_string, 16), int(state, 16))
+        return merged.to_bytes(self.FRAME_SIZE, "big").hex()
 
-        logger.info(f"CURRENT STATE: {input_string}")
-        logger.info(f"CHANGES:       {state}")
+    def update(self, status_diff: str | bytes) -> t.FrozenSet[str]:
+        """Merge status_diff into the state and return names of the properties whose value changed."""
+        diff = self.parse_frame(status_diff)
 
-        # Convert strings to list of 2-char hex bytes for easier manipulation
-        input_bytes = [input_string[i:i+2] for i in range(0, len(input_string), 2)]
-        state_bytes = [state[i:i+2] for i in range(0, len(state), 2)]
+        if diff is None:
+            raise ValueError(f"Malformed state diff: {status_diff!r}")
 
-        # Merge based on rules
-        merged_bytes = []
-        for i, input_byte in enumerate(input_bytes):
-            if input_byte.lower() == 'ff':
-                # Don't merge, keep existing state
-                merged_bytes.append(state_bytes[i])
-            else:
-                # Merge: replace state with input value
-                merged_bytes.append(input_byte)
+        return self.update_frame(diff)
 
-        output_state = ''.join(merged_bytes)
-        logger.info(f"NEW STATE:     {output_state}")
-        return output_state
+    def update_frame(self, diff: int) -> t.FrozenSet[str]:
+        """Same as update for a diff already validated by parse_frame."""
+        current = int.from_bytes(self._frame, "big")
+        merged = self.merge_frames(diff, current)
+        changed_bytes = current ^ merged
 
+        if not changed_bytes:
+            return frozenset()
 
-    def update(self, status_diff: str) -> bool:
-        old_status_string = self._status_string
-        state_update = self.merge(status_diff, old_status_string)
+        candidates: t.Set[str] = set()
+        for offset, changed_bits in enumerate(changed_bytes.to_bytes(self.FRAME_SIZE, "big")):
+            if changed_bits:
+                candidates.update(self._BYTE_FIELDS[offset])
 
-        self.decode(state_update)
-        changed = True
+        old_values = {name: getattr(self, name) for name in candidates}
+        self._set_frame(merged.to_bytes(self.FRAME_SIZE, "big"))
 
-        return changed
+        return frozenset(name for name, old_value in old_values.items() if getattr(self, name) != old_value)
+
+    @classmethod
+    def fields_in_frame(cls, diff: int) -> t.FrozenSet[str]:
+        """Names of the properties with at least one byte present (not NONE_VAL) in diff."""
+        fields: t.Set[str] = set()
+        for offset, value in enumerate(diff.to_bytes(cls.FRAME_SIZE, "big")):
+            if value != cls.NONE_VAL:
+                fields.update(cls._BYTE_FIELDS[offset])
+
+        return frozenset(fields)
 
     def update_from_hbt(self, hb_data: t.Any) -> bool:
         changed = False
@@ -196,8 +489,9 @@ class ToshibaAcFcuState:
             self._ac_indoor_temperature = hb_data["iTemp"]
             changed = True
 
-        if "oTemp" in hb_data and hb_data["oTemp"] != self._ac_outdoor_temperature:
-            self._ac_outdoor_temperature = hb_data["oTemp"]
+        outdoor_temperature_byte = self.FRAME_LAYOUT["ac_outdoor_temperature"].offset
+        if "oTemp" in hb_data and hb_data["oTemp"] != self._frame[outdoor_temperature_byte]:
+            self._set_bytes(outdoor_temperature_byte, bytes((hb_data["oTemp"],)))
             changed = True
 
         return changed
@@ -219,75 +513,32 @@ class ToshibaAcFcuState:
         self._ac_mode = ToshibaAcFcuState.AcMode.to_raw(val)
 
     @property
-    def ac_temperature(self) -> t.Optional[int]:
+    def ac_temperature(self) -> t.Optional[float]:
         return ToshibaAcFcuState.AcTemperature.from_raw(self._ac_temperature)
 
     @ac_temperature.setter
-    def ac_temperature(self, val: t.Optional[int]) -> None:
+    def ac_temperature(self, val: t.Optional[float]) -> None:
         self._ac_temperature = ToshibaAcFcuState.AcTemperature.to_raw(val)
 
-
-    @property
-    def ac_outdoor_temperature(self) -> t.Optional[int]:
-        return ToshibaAcFcuState.AcTemperature.from_raw(self._ac_outdoor_temperature)
-
-    @ac_outdoor_temperature.setter
-    def ac_outdoor_temperature(self, val: t.Optional[int]) -> None:
-        self._ac_outdoor_temperature = ToshibaAcFcuState.AcTemperature.to_raw(val)
-
-    @property
-    def dhw_target_temperature(self) -> t.Optional[int]:
-        return ToshibaAcFcuState.AcTemperature.from_raw(self._dhw_target_temperature)
-
-    @dhw_target_temperature.setter
-    def dhw_target_temperature(self, val: t.Optional[int]) -> None:
-        self._dhw_target_temperature = ToshibaAcFcuState.AcTemperature.to_raw(val)
-
-    @property
-    def dhw_target_temperature(self) -> t.Optional[int]:
-        return ToshibaAcFcuState.AcTemperature.from_raw(self._dhw_target_temperature)
-
-    @dhw_target_temperature.setter
-    def dhw_target_temperature(self, val: t.Optional[int]) -> None:
-        self._dhw_target_temperature = ToshibaAcFcuState.AcTemperature.to_raw(val)
-
-    @property
-    def zone1_target_temperature(self) -> t.Optional[int]:
-        return ToshibaAcFcuState.AcTemperature.from_raw(self._zone1_target_temperature)
-
-    @zone1_target_temperature.setter
-    def zone1_target_temperature(self, val: t.Optional[int]) -> None:
-        self._zone1_target_temperature = ToshibaAcFcuState.AcTemperature.to_raw(val)
-
     @property
     def compressor_status(self) -> t.Optional[EstiaCompressorStatus]:
-        if self._new_outdoor_unit_dhw:
+        if self.outdoor_unit_dhw_is_active:
             return EstiaCompressorStatus.DHW
 
-        if self._outdoor_unit_heat:
+        if self.outdoor_unit_heat_is_active:
             return EstiaCompressorStatus.HEAT
 
-        return EstiaCompressorStatus.OFF
-
-    @property
-    def zone1_mode(self) -> t.Optional[EstiaWaterMode]:
-        return ToshibaAcFcuState.EstiaWaterMode.from_raw(self._water_operation_mode)
-
-    @property
-    def water_pump_is_running(self) -> t.Optional[bool]:
-        return self._water_pump_status
-
-    @property
-    def electric_coil_dhw_is_active(self) -> t.Optional[bool]:
-        return self._new_heating_coil_dhw
+        if self.outdoor_unit_dhw_is_active is None or self.outdoor_unit_heat_is_active is None:
+            return EstiaCompressorStatus.NONE
 
-    @property
-    def electric_coil_heat_is_active(self) -> t.Optional[bool]:
-        return self._heating_coil_heat
+        return EstiaCompressorStatus.OFF
 
     def __str__(self) -> str:
         res = f"Printing State"
-        res += f", OperationModeWater: {self._water_operation_mode}" #
-        res += f", Compressor(DHW/HEAT): {self._new_outdoor_unit_dhw}/{self._outdoor_unit_heat}"
-        res += f", WaterPumpStatus: {self._water_pump_status}"
+        res += f", OperationModeWater: {self.zone1_mode}"
+        res += f", Compressor(DHW/HEAT): {self.outdoor_unit_dhw_is_active}/{self.outdoor_unit_heat_is_active}"
+        res += f", WaterPumpStatus: {self.water_pump_is_running}"
         return res
+
+
+ToshibaAcFcuState._compile_frame_layout()
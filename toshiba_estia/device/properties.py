@@ -13,12 +13,13 @@
 # limitations under the License.
 
 
+import typing as t
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum, auto
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToshibaAcDeviceEnergyConsumption:
     energy_wh: float
     since: datetime
@@ -47,3 +48,55 @@ class ToshibaAcMode(Enum):
     COOL = auto()
     HEAT = auto()
     NONE = None
+
+
+class ToshibaAcDeviceValueSource(Enum):
+    MAPPING = auto()
+    HTTP_RELOAD = auto()
+    AMQP_FRAME = auto()
+    HEARTBEAT = auto()
+    ADDITIONAL_INFO = auto()
+    CONNECTION_STATE = auto()
+    ENERGY_CONSUMPTION = auto()
+
+
+@dataclass(frozen=True, slots=True)
+class ToshibaAcDeviceValueProvenance:
+    # time.monotonic() when the value was last received, even if it did not change
+    timestamp: float
+    source: ToshibaAcDeviceValueSource
+
+
+@dataclass(frozen=True, slots=True)
+class ToshibaAcDeviceSnapshot:
+    """Consistent copy of every public ToshibaAcDevice value, version grows by one with each published snapshot."""
+
+    version: int
+    name: str
+    ac_id: str
+    ac_unique_id: str
+    firmware_version: str
+    model_id: t.Optional[str]
+    cdu: t.Optional[str]
+    fcu: t.Optional[str]
+    serial_number: t.Optional[str]
+    is_online: t.Optional[bool]
+    ac_status: ToshibaAcStatus
+    ac_mode: ToshibaAcMode
+    ac_temperature: t.Optional[float]
+    mode: EstiaWaterMode
+    ac_outdoor_temperature: t.Optional[float]
+    zone1_target_temperature: t.Optional[float]
+    dhw_target_temperature: t.Optional[float]
+    twi_temperature: t.Optional[float]
+    two_temperature: t.Optional[float]
+    tho_temperature: t.Optional[float]
+    to_temperature: t.Optional[float]
+    tfi_temperature: t.Optional[float]
+    room_water_temperature: t.Optional[float]
+    water_flow_rate: t.Optional[float]
+    water_pump_status: t.Optional[bool]
+    compressor_status: t.Optional[EstiaCompressorStatus]
+    electric_coil_dhw_is_active: t.Optional[bool]
+    electric_coil_heat_is_active: t.Optional[bool]
+    ac_energy_consumption: t.Optional[ToshibaAcDeviceEnergyConsumption]
@@ -0,0 +1,144 @@
+# Copyright 2022 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixed capacity ring buffer of recent device samples, queries are vectorized when numpy is installed."""
+
+from __future__ import annotations
+
+import importlib
+import math
+import time
+import typing as t
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+# Optional dependency, imported as Any so that the None fallback type checks with and without numpy installed
+try:
+    np: t.Any = importlib.import_module("numpy")
+except ImportError:
+    np = None
+
+
+@dataclass(frozen=True, slots=True)
+class EstiaTelemetryStats:
+    count: int
+    min: t.Optional[float]
+    max: t.Optional[float]
+    mean: t.Optional[float]
+
+
+class EstiaTelemetryBuffer:
+    # Column name -> array typecode, missing values are stored as NaN
+    COLUMNS = {
+        "tfi_temperature": "f",
+        "tho_temperature": "f",
+        "to_temperature": "f",
+        "twi_temperature": "f",
+        "two_temperature": "f",
+        "water_flow_rate": "f",
+        # 1 running, 0 stopped. The compressor runs while its status is DHW or HEAT
+        "compressor_is_running": "f",
+        "water_pump_is_running": "f",
+    }
+
+    __slots__ = ("capacity", "timestamps", "columns", "_head", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Telemetry capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        # Preallocated so that memory use does not depend on how long the device has been running
+        self.timestamps = array("d", [0.0]) * capacity
+        self.columns = {name: array(code, [math.nan]) * capacity for name, code in self.COLUMNS.items()}
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, values: t.Mapping[str, t.Optional[float]], timestamp: t.Optional[float] = None) -> None:
+        """Store a sample, overwriting the oldest one when full. Timestamps must not decrease."""
+        head = self._head
+        self.timestamps[head] = time.time() if timestamp is None else timestamp
+
+        for name, column in self.columns.items():
+            value = values.get(name)
+            column[head] = math.nan if value is None else value
+
+        self._head = (head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+
+    def _start(self) -> int:
+        return (self._head - self._count) % self.capacity
+
+    def _ordered(self, column: array) -> array:
+        start = self._start()
+        end = start + self._count
+
+        if end <= self.capacity:
+            return column[start:end]
+
+        return column[start:] + column[: end - self.capacity]
+
+    def _index_range(self, since: t.Optional[float], until: t.Optional[float]) -> t.Tuple[int, int]:
+        timestamps = self._ordered(self.timestamps)
+        first = 0 if since is None else bisect_left(timestamps, since)
+        last = len(timestamps) if until is None else bisect_right(timestamps, until)
+        return first, max(first, last)
+
+    def range(self, since: t.Optional[float] = None, until: t.Optional[float] = None) -> t.Dict[str, array]:
+        """Samples with since <= timestamp <= until in chronological order, one array per column."""
+        first, last = self._index_range(since, until)
+        columns = {"timestamp": self._ordered(self.timestamps)[first:last]}
+
+        for name, column in self.columns.items():
+            columns[name] = self._ordered(column)[first:last]
+
+        return columns
+
+    def last(self, seconds: float, now: t.Optional[float] = None) -> t.Dict[str, array]:
+        return self.range((time.time() if now is None else now) - seconds)
+
+    def stats(self, name: str, since: t.Optional[float] = None, until: t.Optional[float] = None) -> EstiaTelemetryStats:
+        """Minimum, maximum and mean of a column over a time range, missing values are skipped."""
+        first, last = self._index_range(since, until)
+        values = self._ordered(self.columns[name])[first:last]
+
+        if np is not None:
+            data = np.frombuffer(values, dtype=np.float32)
+            data = data[~np.isnan(data)]
+
+            if not len(data):
+                return EstiaTelemetryStats(0, None, None, None)
+
+            return EstiaTelemetryStats(len(data), float(data.min()), float(data.max()), float(data.mean()))
+
+        present = [value for value in values if not math.isnan(value)]
+
+        if not present:
+            return EstiaTelemetryStats(0, None, None, None)
+
+        return EstiaTelemetryStats(len(present), min(present), max(present), math.fsum(present) / len(present))
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.itemsize * self.capacity + sum(
+            column.itemsize * self.capacity for column in self.columns.values()
+        )
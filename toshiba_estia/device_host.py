@@ -0,0 +1,221 @@
+# Copyright 2022 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import typing as t
+from dataclasses import dataclass
+
+import aiohttp
+
+from toshiba_estia.device import ToshibaAcDevice
+from toshiba_estia.device_manager import ToshibaAcDeviceManager
+from toshiba_estia.utils import gather_with_concurrency
+from toshiba_estia.utils.scheduler import ToshibaAcScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ToshibaAcDeviceHostError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ToshibaAcHostMetrics:
+    accounts: int
+    connected_accounts: int
+    failed_accounts: int
+    account_failures: int
+    devices: int
+    scheduled_jobs: int
+    running_jobs: int
+
+
+class ToshibaAcAccount:
+    __slots__ = ("account_id", "manager", "connected", "failures", "last_error", "connect_task")
+
+    def __init__(self, account_id: str, manager: ToshibaAcDeviceManager) -> None:
+        self.account_id = account_id
+        self.manager = manager
+        self.connected = False
+        self.failures = 0
+        self.last_error: t.Optional[str] = None
+        # Connect in progress, shared by everyone asking to connect the account meanwhile
+        self.connect_task: t.Optional[asyncio.Task[bool]] = None
+
+
+class ToshibaAcDeviceHost:
+    """Runs the device managers of many accounts in one process.
+
+    Accounts share one HTTP connection pool and one scheduler for all periodic work. Credentials, the AMQP
+    connection and the devices stay with the manager of each account, and a failing account is only retried, it never
+    affects the others. The shared session keeps no cookies, a session passed in should use aiohttp.DummyCookieJar too.
+    """
+
+    ACCOUNT_CONNECT_CONCURRENCY = 4
+    ACCOUNT_RETRY_PERIOD_MINUTES = 5
+
+    def __init__(
+        self, session: t.Optional[aiohttp.ClientSession] = None, scheduler: t.Optional[ToshibaAcScheduler] = None
+    ) -> None:
+        self.session = session
+        self._owns_session = session is None
+        self.scheduler = scheduler if scheduler is not None else ToshibaAcScheduler()
+        self._owns_scheduler = scheduler is None
+        self.accounts: t.Dict[str, ToshibaAcAccount] = {}
+        self.account_connect_concurrency = self.ACCOUNT_CONNECT_CONCURRENCY
+
+    def add_account(
+        self,
+        account_id: str,
+        username: str,
+        password: str,
+        device_id: t.Optional[str] = None,
+        sas_token: t.Optional[str] = None,
+    ) -> ToshibaAcDeviceManager:
+        """Register an account, it is connected by the next connect() or retry of failed accounts."""
+        if account_id in self.accounts:
+            raise ToshibaAcDeviceHostError(f"Account {account_id} already added")
+
+        if not self.session:
+            # Cookies set for one account must not be sent with the requests of another
+            self.session = aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+
+        manager = ToshibaAcDeviceManager(
+            username, password, device_id, sas_token, scheduler=self.scheduler, session=self.session
+        )
+        self.accounts[account_id] = ToshibaAcAccount(account_id, manager)
+
+        return manager
+
+    async def connect(self) -> None:
+        """Connect every account not connected yet, failures are recorded per account and retried periodically."""
+        self.scheduler.start()
+        # Connected right away below, the first retry comes a whole period later
+        retry_period_s = self.ACCOUNT_RETRY_PERIOD_MINUTES * 60
+        self.scheduler.schedule(
+            "host.retry_failed_accounts", retry_period_s, self.retry_failed_accounts, first_delay_s=retry_period_s
+        )
+
+        await self.retry_failed_accounts()
+
+    async def retry_failed_accounts(self) -> None:
+        """Reconnect accounts that failed to connect or lost their connection since."""
+        for account in self.accounts.values():
+            if account.connected and not account.manager.is_connected:
+                account.connected = False
+                account.failures += 1
+                account.last_error = "Connection lost"
+                logger.warning(f"Account {account.account_id} lost its connection, reconnecting")
+
+        pending = [account for account in self.accounts.values() if not account.connected]
+        await gather_with_concurrency(
+            self.account_connect_concurrency, *(self.connect_account(account) for account in pending)
+        )
+
+    async def connect_account(self, account: ToshibaAcAccount) -> bool:
+        """Connect the account unless connected already, joining a connect that is in progress."""
+        if account.connected:
+            return True
+
+        if account.connect_task is None or account.connect_task.done():
+            account.connect_task = asyncio.get_running_loop().create_task(self._connect_account(account))
+
+        task = account.connect_task
+        try:
+            # Shielded, a cancelled caller must not interrupt the connect other callers wait for
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                # Stopped by remove_account or shutdown
+                return False
+            raise
+
+    async def _connect_account(self, account: ToshibaAcAccount) -> bool:
+        # Start from scratch, a manager that lost its connection still holds its APIs and devices
+        await self._reset_account(account)
+
+        try:
+            await account.manager.connect()
+            await account.manager.get_devices()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            account.connected = False
+            account.failures += 1
+            account.last_error = str(e)
+            logger.error(f"Connecting account {account.account_id} failed: {e}")
+
+            await self._reset_account(account)
+            return False
+
+        account.connected = True
+        account.last_error = None
+        return True
+
+    async def _reset_account(self, account: ToshibaAcAccount) -> None:
+        try:
+            await account.manager.shutdown()
+        except Exception as e:
+            logger.debug(f"Shutting down account {account.account_id} failed: {e}")
+
+        account.manager.devices.clear()
+
+    async def remove_account(self, account_id: str) -> None:
+        account = self.accounts.pop(account_id, None)
+        if account is None:
+            raise ToshibaAcDeviceHostError(f"Unknown account {account_id}")
+
+        await self._stop_account(account)
+
+    async def _stop_account(self, account: ToshibaAcAccount) -> None:
+        # A connect still in progress would bring the manager back up after the shutdown
+        if account.connect_task is not None and not account.connect_task.done():
+            account.connect_task.cancel()
+            await asyncio.gather(account.connect_task, return_exceptions=True)
+
+        account.connected = False
+        await account.manager.shutdown()
+
+    async def shutdown(self) -> None:
+        accounts = list(self.accounts.values())
+        self.accounts.clear()
+        self.scheduler.cancel("host.retry_failed_accounts")
+
+        results = await asyncio.gather(*(self._stop_account(account) for account in accounts), return_exceptions=True)
+        for account, result in zip(accounts, results):
+            if isinstance(result, Exception):
+                logger.error(f"Shutting down account {account.account_id} failed: {result}")
+
+        if self._owns_scheduler:
+            await self.scheduler.shutdown()
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def devices(self) -> t.Dict[str, t.List[ToshibaAcDevice]]:
+        return {account_id: list(account.manager.devices.values()) for account_id, account in self.accounts.items()}
+
+    def metrics(self) -> ToshibaAcHostMetrics:
+        accounts = self.accounts.values()
+        return ToshibaAcHostMetrics(
+            accounts=len(self.accounts),
+            connected_accounts=sum(account.connected for account in accounts),
+            failed_accounts=sum(not account.connected and account.failures > 0 for account in accounts),
+            account_failures=sum(account.failures for account in accounts),
+            devices=sum(len(account.manager.devices) for account in accounts),
+            scheduled_jobs=len(self.scheduler),
+            running_jobs=self.scheduler.running_jobs,
+        )
@@ -14,12 +14,21 @@
 
 import asyncio
 import logging
+import time
 import typing as t
+from dataclasses import dataclass
 
+import aiohttp
 from toshiba_estia.device import ToshibaAcDevice
-from toshiba_estia.utils import async_sleep_until_next_multiply_of_minutes, ToshibaAcCallback
+from toshiba_estia.utils import gather_with_concurrency, ToshibaAcCallback
 from toshiba_estia.utils.amqp_api import ToshibaAcAmqpApi, JSONSerializable
-from toshiba_estia.utils.http_api import ToshibaAcHttpApi, ToshibaDevicesCount, ToshibaDeviceConnectionState
+from toshiba_estia.utils.http_api import (
+    ToshibaAcDeviceInfo,
+    ToshibaAcHttpApi,
+    ToshibaDevicesCount,
+    ToshibaDeviceConnectionState,
+)
+from toshiba_estia.utils.scheduler import ToshibaAcScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +37,39 @@ class ToshibaAcDeviceManagerError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class ToshibaAcStartupTimings:
+    devices: int
+    concurrency: int
+    mapping_s: float
+    connect_s: float
+    energy_consumption_s: float
+    device_status_s: float
+    total_s: float
+
+
 class ToshibaAcSasTokenUpdatedCallback(ToshibaAcCallback[str]):
-    pass
+    __slots__ = ()
+
+
+class ToshibaAcDeviceManagerDeviceCallback(ToshibaAcCallback[ToshibaAcDevice]):
+    __slots__ = ()
 
 
 class ToshibaAcDeviceManager:
     FETCH_ENERGY_CONSUMPTION_PERIOD_MINUTES = 60
-    FETCH_DEVICE_STATUS_PERIOD_MINUTES = 60
+    FETCH_ENERGY_CONSUMPTION_JITTER_S = 300
+    LIVENESS_CHECK_PERIOD_S = 60
+    BULK_STATE_RELOAD_PERIOD_MINUTES = 10
+    BULK_STATE_RELOAD_JITTER_S = 60
+    DISCOVERY_PERIOD_MINUTES = 15
+    DISCOVERY_JITTER_S = 120
+    # Devices loading their extended info at once during startup
+    STARTUP_CONCURRENCY = 8
+    # Online devices silent for longer are confirmed over HTTP and marked offline unless still connected
+    LIVENESS_TIMEOUT_S = 15 * 60
+    # A periodic job failing this many runs in a row means the connection to the cloud is lost
+    CONNECTION_LOST_FAILED_RUNS = 3
 
     def __init__(
         self,
@@ -42,26 +77,42 @@ class ToshibaAcDeviceManager:
         password: str,
         device_id: t.Optional[str] = None,
         sas_token: t.Optional[str] = None,
+        scheduler: t.Optional[ToshibaAcScheduler] = None,
+        bulk_state_reload: bool = False,
+        session: t.Optional[aiohttp.ClientSession] = None,
     ):
         self.username = username
         self.password = password
         self.http_api: t.Optional[ToshibaAcHttpApi] = None
+        # HTTP session shared with other managers, by default every manager opens its own
+        self.session = session
         self.reg_info = None
         self.amqp_api: t.Optional[ToshibaAcAmqpApi] = None
         self.device_id = self.username + "_" + (device_id or "3e6e4eb5f0e5aa46")
         self.sas_token = sas_token
         self.devices: t.Dict[str, ToshibaAcDevice] = {}
-        self.periodic_fetch_energy_consumption_task: t.Optional[asyncio.Task[None]] = None
-        self.periodic_fetch_device_connection_task: t.Optional[asyncio.Task[None]] = None
+        # Runs the periodic work of the manager and of all its devices, may be shared with other managers
+        self.scheduler = scheduler if scheduler is not None else ToshibaAcScheduler()
+        self._owns_scheduler = scheduler is None
+        # Reload the state of all devices from one mapping request instead of one state request per device.
+        # Opt in, the bulk reload does not refresh the additional device info that per device reloads load.
+        self.bulk_state_reload = bulk_state_reload
+        self.startup_concurrency = self.STARTUP_CONCURRENCY
+        self.startup_timings: t.Optional[ToshibaAcStartupTimings] = None
+        self.startup_task: t.Optional[asyncio.Task[None]] = None
+        self.liveness_timeout_s: float = self.LIVENESS_TIMEOUT_S
         self.lock = asyncio.Lock()
         self.loop = asyncio.get_running_loop()
         self._on_sas_token_updated_callback = ToshibaAcSasTokenUpdatedCallback()
+        self._on_device_added_callback = ToshibaAcDeviceManagerDeviceCallback()
+        self._on_device_removed_callback = ToshibaAcDeviceManagerDeviceCallback()
+        self._devices_count: t.Optional[ToshibaDevicesCount] = None
 
     async def connect(self) -> str:
         try:
             async with self.lock:
                 if not self.http_api:
-                    self.http_api = ToshibaAcHttpApi(self.username, self.password)
+                    self.http_api = ToshibaAcHttpApi(self.username, self.password, self.session)
                     await self.http_api.connect()
 
                 if not self.sas_token:
@@ -84,15 +135,19 @@ class ToshibaAcDeviceManager:
         async with self.lock:
             tasks: t.List[t.Awaitable[None]] = []
 
-            if self.periodic_fetch_device_connection_task:
-                self.periodic_fetch_device_connection_task.cancel()
-                tasks.append(self.periodic_fetch_device_connection_task)
-
-            if self.periodic_fetch_energy_consumption_task:
-                self.periodic_fetch_energy_consumption_task.cancel()
-                tasks.append(self.periodic_fetch_energy_consumption_task)
+            if self.startup_task:
+                self.startup_task.cancel()
+                tasks.append(self.startup_task)
 
+            # Runs in progress are stopped as well, the scheduler may be shared and keep running
+            for job_name in self.job_names:
+                job = self.scheduler.job(job_name)
+                if job is not None:
+                    self.scheduler.cancel(job_name)
+                    tasks.append(job.cancel_and_wait())
 
+            if self._owns_scheduler:
+                tasks.append(self.scheduler.shutdown())
 
             tasks.extend(device.shutdown() for device in self.devices.values())
 
@@ -116,29 +171,69 @@ class ToshibaAcDeviceManager:
 
                     raise_all_errors(*results)
             finally:
-                self.periodic_fetch_device_connection_task = None
-                self.periodic_fetch_energy_consumption_task = None
+                self.startup_task = None
                 self.amqp_api = None
                 self.http_api = None
 
-    async def periodic_fetch_energy_consumption(self) -> None:
-        while True:
-            await async_sleep_until_next_multiply_of_minutes(self.FETCH_ENERGY_CONSUMPTION_PERIOD_MINUTES)
-            try:
-                await self.fetch_energy_consumption()
-            except asyncio.CancelledError:
-                raise
-            except Exception as e:
-                logger.error(f"Fetching energy consumption failed: {e}")
-                pass
-
-    async def fetch_energy_consumption(self) -> None:
+    @property
+    def is_connected(self) -> bool:
+        """Whether HTTP and AMQP are connected and no periodic job keeps failing."""
+        if not self.http_api or not self.amqp_api or not self.amqp_api.connected:
+            return False
+
+        jobs = (self.scheduler.job(job_name) for job_name in self.job_names)
+        return all(job is None or job.consecutive_failures < self.CONNECTION_LOST_FAILED_RUNS for job in jobs)
+
+    @property
+    def job_names(self) -> t.Tuple[str, str, str, str]:
+        return (
+            f"{self.device_id}.energy_consumption",
+            f"{self.device_id}.liveness_check",
+            f"{self.device_id}.bulk_state_reload",
+            f"{self.device_id}.discovery",
+        )
+
+    def schedule_periodic_jobs(self) -> None:
+        energy_job, liveness_job, bulk_state_reload_job, discovery_job = self.job_names
+
+        if self.bulk_state_reload:
+            self.scheduler.schedule(
+                bulk_state_reload_job,
+                self.BULK_STATE_RELOAD_PERIOD_MINUTES * 60,
+                self.reload_device_states,
+                jitter_s=self.BULK_STATE_RELOAD_JITTER_S,
+            )
+
+        self.scheduler.schedule(
+            energy_job,
+            self.FETCH_ENERGY_CONSUMPTION_PERIOD_MINUTES * 60,
+            self.fetch_energy_consumption,
+            jitter_s=self.FETCH_ENERGY_CONSUMPTION_JITTER_S,
+        )
+        # Heartbeats keep the connection state current, HTTP is only asked about devices gone silent
+        self.scheduler.schedule(liveness_job, self.LIVENESS_CHECK_PERIOD_S, self.check_liveness)
+        self.scheduler.schedule(
+            discovery_job,
+            self.DISCOVERY_PERIOD_MINUTES * 60,
+            self.discover_devices,
+            jitter_s=self.DISCOVERY_JITTER_S,
+        )
+        self.scheduler.start()
+
+    async def fetch_energy_consumption(self, ac_unique_ids: t.Optional[t.Collection[str]] = None) -> None:
+        """Defaults to every device of the account."""
         if not self.http_api:
             raise ToshibaAcDeviceManagerError("Not connected")
 
         consumptions = await self.http_api.get_devices_energy_consumption(
-            [ac_unique_id for ac_unique_id in self.devices.keys()]
+            list(self.devices.keys() if ac_unique_ids is None else ac_unique_ids)
         )
+        # Devices may have been removed by discovery while the request was in flight
+        consumptions = {
+            ac_unique_id: consumption
+            for ac_unique_id, consumption in consumptions.items()
+            if ac_unique_id in self.devices
+        }
 
         logger.debug(
             "Power consumption for devices: {"
@@ -157,24 +252,19 @@ class ToshibaAcDeviceManager:
 
         await asyncio.gather(*updates)
 
-    async def periodic_fetch_device_connection(self) -> None:
-        while True:
-            await async_sleep_until_next_multiply_of_minutes(self.FETCH_DEVICE_STATUS_PERIOD_MINUTES)
-            try:
-                await self.fetch_device_status()
-            except asyncio.CancelledError:
-                raise
-            except Exception as e:
-                logger.error(f"Fetching device status failed: {e}")
-                pass
-
-    async def fetch_device_status(self) -> None:
+    async def fetch_device_status(self, ac_unique_ids: t.Optional[t.Collection[str]] = None) -> None:
+        """Defaults to every device of the account."""
         if not self.http_api:
             raise ToshibaAcDeviceManagerError("Not connected")
 
         devices_connection_status = await self.http_api.get_device_connection_state(
-            [ac_unique_id for ac_unique_id in self.devices.keys()]
+            list(self.devices.keys() if ac_unique_ids is None else ac_unique_ids)
         )
+        devices_connection_status = {
+            ac_unique_id: connection_status
+            for ac_unique_id, connection_status in devices_connection_status.items()
+            if ac_unique_id in self.devices
+        }
 
         logger.debug(
             "Connection status for devices: {"
@@ -194,14 +284,102 @@ class ToshibaAcDeviceManager:
 
         await asyncio.gather(*updates)
 
+    async def reload_device_states(self) -> None:
+        """Reload the state of every device due for a reload from a single mapping request.
 
-    async def get_devices(self) -> t.List[ToshibaAcDevice]:
+        Devices kept fresh by AMQP pushes are skipped, and no request is made when none is due. Due devices missing
+        from the mapping, or all of them when the mapping request fails, fall back to their own state request.
+        """
+        if not self.http_api:
+            raise ToshibaAcDeviceManagerError("Not connected")
+
+        now = time.monotonic()
+        missing: t.Dict[str, ToshibaAcDevice] = {}
+
+        for ac_unique_id, device in self.devices.items():
+            if device.state_reload_due(now):
+                missing[ac_unique_id] = device
+            else:
+                device.skip_state_reload()
+
+        if not missing:
+            return
+
+        try:
+            devices_info = await self.http_api.get_devices()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Bulk state reload failed, falling back to per device reloads: {e}")
+            devices_info = []
+
+        updates = []
+
+        for device_info in devices_info:
+            due_device = missing.pop(device_info.ac_unique_id, None)
+            if due_device:
+                updates.append(due_device.handle_bulk_state(device_info.initial_ac_state))
+
+        updates.extend(device.state_reload() for device in missing.values())
+
+        results = await asyncio.gather(*updates, return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"State reload failed: {result}")
+
+    async def check_liveness(self) -> None:
+        """Confirm online devices that stopped sending AMQP messages over HTTP, mark the disconnected ones offline."""
+        if not self.http_api:
+            raise ToshibaAcDeviceManagerError("Not connected")
+
+        now = time.monotonic()
+        suspects = [
+            device
+            for device in self.devices.values()
+            if device.is_online and device.silent_for(now) > self.liveness_timeout_s
+        ]
+
+        if not suspects:
+            return
+
+        logger.debug(f"Devices silent for over {self.liveness_timeout_s}s: {', '.join(d.name for d in suspects)}")
+
+        try:
+            connection_states = await self.http_api.get_device_connection_state(
+                [device.ac_unique_id for device in suspects]
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without a confirmation the silence alone decides
+            logger.warning(f"Confirming connection state failed: {e}")
+            connection_states = {}
+
+        updates = []
+
+        for device in suspects:
+            connection_state = connection_states.get(device.ac_unique_id)
+            updates.append(device.handle_connection_state(connection_state.online if connection_state else False))
+
+        await asyncio.gather(*updates)
+
+    async def get_devices(self, lazy: bool = False) -> t.List[ToshibaAcDevice]:
+        """Devices of the account, created on the first call.
+
+        By default returns once every device loaded its extended info, energy consumption and connection state. With
+        lazy the devices are returned as soon as the mapping is fetched and the rest loads in startup_task, follow it
+        with ToshibaAcDevice.ready() and the usual change notifications.
+        """
         if not self.http_api or not self.amqp_api:
             raise ToshibaAcDeviceManagerError("Not connected")
 
         async with self.lock:
             if not self.devices:
+                started = time.monotonic()
+
                 devices_info = await self.http_api.get_devices()
+                mapping_s = time.monotonic() - started
 
                 logger.debug(
                     "Found devices: {"
@@ -214,45 +392,201 @@ class ToshibaAcDeviceManager:
                     )
                 )
 
-                connects = []
-
                 for device_info in devices_info:
-                    device = ToshibaAcDevice(
-                        device_info.ac_name,
-                        self.device_id,
-                        device_info.ac_id,
-                        device_info.ac_unique_id,
-                        device_info.initial_ac_state,
-                        device_info.firmware_version,
-                        device_info.merit_feature,
-                        device_info.ac_model_id,
-                        self.amqp_api,
-                        self.http_api,
-                    )
+                    self.add_device(device_info)
 
-                    connects.append(device.connect())
+                # Started outside of the lock, so that other callers and discovery do not wait for the slowest device
+                self.startup_task = asyncio.get_running_loop().create_task(
+                    self._start_devices_in_background(started, mapping_s)
+                    if lazy
+                    else self.start_devices(started, mapping_s)
+                )
 
-                    logger.debug(f"Adding device {device.name}")
+        if not lazy and self.startup_task and not self.startup_task.cancelled():
+            # Awaited even when done, a failed startup raises its error to every caller instead of returning devices
+            # that never loaded. Shielded, a cancelled caller must not abort the startup other callers wait for
+            await asyncio.shield(self.startup_task)
 
-                    self.devices[device.ac_unique_id] = device
+        return list(self.devices.values())
 
-                await asyncio.gather(*connects)
+    def add_device(self, device_info: ToshibaAcDeviceInfo) -> ToshibaAcDevice:
+        if not self.http_api or not self.amqp_api:
+            raise ToshibaAcDeviceManagerError("Not connected")
 
-                await self.fetch_energy_consumption()
-                await self.fetch_device_status()
+        device = ToshibaAcDevice(
+            device_info.ac_name,
+            self.device_id,
+            device_info.ac_id,
+            device_info.ac_unique_id,
+            device_info.initial_ac_state,
+            device_info.firmware_version,
+            device_info.merit_feature,
+            device_info.ac_model_id,
+            self.amqp_api,
+            self.http_api,
+        )
 
-                if not self.periodic_fetch_energy_consumption_task:
-                    self.periodic_fetch_energy_consumption_task = asyncio.get_running_loop().create_task(
-                        self.periodic_fetch_energy_consumption()
-                    )
+        logger.debug(f"Adding device {device.name}")
 
-                if not self.periodic_fetch_device_connection_task:
-                    self.periodic_fetch_device_connection_task = asyncio.get_running_loop().create_task(
-                        self.periodic_fetch_device_connection()
-                    )
+        self.devices[device.ac_unique_id] = device
+        return device
+
+    async def discover_devices(self, force: bool = False) -> None:
+        """Add devices new in the mapping and remove the ones gone from it.
+
+        The full mapping is only fetched when force is set or the device counts of the account moved. Added devices
+        load their extended info, energy consumption and connection state like at startup, and are only kept and
+        announced once connected.
+        """
+        if not self.http_api:
+            raise ToshibaAcDeviceManagerError("Not connected")
+
+        devices_count = await self.http_api.get_devices_count()
+        previous_count, self._devices_count = self._devices_count, devices_count
+
+        unchanged = previous_count is None or devices_count == previous_count
+        if not force and unchanged and devices_count.total_estia == len(self.devices):
+            return
+
+        logger.debug(f"Device counts changed to {devices_count}, refreshing the mapping")
+
+        devices_info = await self.http_api.get_devices()
+
+        async with self.lock:
+            known = {device_info.ac_unique_id for device_info in devices_info}
+            removed = [device for ac_unique_id, device in self.devices.items() if ac_unique_id not in known]
+            added = [self.add_device(info) for info in devices_info if info.ac_unique_id not in self.devices]
+
+            for device in removed:
+                logger.info(f"Removing device {device.name}")
+                del self.devices[device.ac_unique_id]
+
+        results = await asyncio.gather(*(device.shutdown() for device in removed), return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Removing device failed: {result}")
+
+        connected = await self.start_added_devices(added)
+
+        # Devices failing to connect are dropped, the count mismatch makes the next discovery try them again
+        failed = [device for device in added if device not in connected]
+        async with self.lock:
+            for device in failed:
+                if self.devices.get(device.ac_unique_id) is device:
+                    del self.devices[device.ac_unique_id]
+
+        await asyncio.gather(*(device.shutdown() for device in failed), return_exceptions=True)
+
+        for device in removed:
+            await self.on_device_removed_callback(device)
+
+        for device in connected:
+            logger.info(f"Added device {device.name}")
+            await self.on_device_added_callback(device)
+
+    async def start_added_devices(self, devices: t.List[ToshibaAcDevice]) -> t.List[ToshibaAcDevice]:
+        """Load devices added after startup the same way start_devices does, return the ones that connected."""
+        if not devices:
+            return []
+
+        ac_unique_ids = [device.ac_unique_id for device in devices]
+        connected, energy_consumption, connection_state = await asyncio.gather(
+            gather_with_concurrency(
+                self.startup_concurrency, *(self._connect_added_device(device) for device in devices)
+            ),
+            self._load_capability(
+                self.fetch_energy_consumption(ac_unique_ids), ToshibaAcDevice.ENERGY_CONSUMPTION, devices
+            ),
+            self._load_capability(self.fetch_device_status(ac_unique_ids), ToshibaAcDevice.CONNECTION_STATE, devices),
+            return_exceptions=True,
+        )
+
+        # Failed capabilities are held by the ready() futures of the devices and retried by the periodic jobs
+        for result in (energy_consumption, connection_state):
+            if isinstance(result, Exception):
+                logger.error(f"Loading added devices failed: {result}")
 
-            return list(self.devices.values())
+        if isinstance(connected, BaseException):
+            raise connected
 
+        return [device for device, is_connected in zip(devices, connected) if is_connected]
+
+    async def _connect_added_device(self, device: ToshibaAcDevice) -> bool:
+        try:
+            await self._connect_device(device)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Connecting device {device.name} failed: {e}")
+            return False
+
+        return True
+
+    async def start_devices(self, started: float, mapping_s: float) -> None:
+        # Fleet wide fetches only need the device ids, they overlap with the bounded per device connects
+        devices = list(self.devices.values())
+        connect_s, energy_consumption_s, device_status_s = await asyncio.gather(
+            self._timed(self.connect_devices(devices)),
+            self._timed(
+                self._load_capability(self.fetch_energy_consumption(), ToshibaAcDevice.ENERGY_CONSUMPTION, devices)
+            ),
+            self._timed(self._load_capability(self.fetch_device_status(), ToshibaAcDevice.CONNECTION_STATE, devices)),
+        )
+
+        self.startup_timings = ToshibaAcStartupTimings(
+            devices=len(self.devices),
+            concurrency=self.startup_concurrency,
+            mapping_s=mapping_s,
+            connect_s=connect_s,
+            energy_consumption_s=energy_consumption_s,
+            device_status_s=device_status_s,
+            total_s=time.monotonic() - started,
+        )
+        logger.info(f"Startup finished: {self.startup_timings}")
+
+        self.schedule_periodic_jobs()
+
+    async def _start_devices_in_background(self, started: float, mapping_s: float) -> None:
+        try:
+            await self.start_devices(started, mapping_s)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Failed devices hold the error in their ready() futures, periodic jobs recover the rest over time
+            logger.error(f"Background startup failed: {e}")
+            self.schedule_periodic_jobs()
+
+    async def _load_capability(
+        self, aw: t.Awaitable[None], capability: str, devices: t.Iterable[ToshibaAcDevice]
+    ) -> None:
+        try:
+            await aw
+        except Exception as e:
+            for device in devices:
+                device.mark_ready(capability, e)
+            raise
+
+        # Devices missing from the response have nothing to load, they are ready as well
+        for device in devices:
+            device.mark_ready(capability)
+
+    async def connect_devices(self, devices: t.List[ToshibaAcDevice]) -> None:
+        """Connect devices with at most startup_concurrency of them loading their extended info at once."""
+        await gather_with_concurrency(self.startup_concurrency, *(self._connect_device(device) for device in devices))
+
+    async def _connect_device(self, device: ToshibaAcDevice) -> None:
+        try:
+            await device.connect(self.scheduler, periodic_reload=not self.bulk_state_reload)
+        except Exception as e:
+            device.mark_ready(ToshibaAcDevice.ADDITIONAL_INFO, e)
+            raise
+
+    @staticmethod
+    async def _timed(aw: t.Awaitable[None]) -> float:
+        started = time.monotonic()
+        await aw
+        return time.monotonic() - started
 
     async def get_devices_count(self) -> ToshibaDevicesCount:
         if not self.http_api or not self.amqp_api:
@@ -284,7 +618,12 @@ class ToshibaAcDeviceManager:
         payload: dict[str, JSONSerializable],
         timestamp: str,
     ) -> None:
-        asyncio.run_coroutine_threadsafe(self.devices[source_id].handle_cmd_heartbeat_estia(payload), self.loop).result()
+        device = self.devices.get(source_id)
+        if device is None:
+            logger.debug(f"Ignoring heartbeat of unknown device {source_id}")
+            return
+
+        asyncio.run_coroutine_threadsafe(device.handle_cmd_heartbeat_estia(payload), self.loop).result()
 
     def handle_cmd_hcu_from_estia(
         self,
@@ -294,8 +633,21 @@ class ToshibaAcDeviceManager:
         payload: dict[str, JSONSerializable],
         timestamp: str,
     ) -> None:
-        asyncio.run_coroutine_threadsafe(self.devices[source_id].handle_cmd_hcu_from_estia(payload), self.loop).result()
+        device = self.devices.get(source_id)
+        if device is None:
+            logger.debug(f"Ignoring state of unknown device {source_id}")
+            return
+
+        asyncio.run_coroutine_threadsafe(device.handle_cmd_hcu_from_estia(payload), self.loop).result()
 
     @property
     def on_sas_token_updated_callback(self) -> ToshibaAcSasTokenUpdatedCallback:
         return self._on_sas_token_updated_callback
+
+    @property
+    def on_device_added_callback(self) -> ToshibaAcDeviceManagerDeviceCallback:
+        return self._on_device_added_callback
+
+    @property
+    def on_device_removed_callback(self) -> ToshibaAcDeviceManagerDeviceCallback:
+        return self._on_device_removed_callback
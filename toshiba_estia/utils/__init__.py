@@ -102,10 +102,23 @@ def retry_on_exception(
     return decorator
 
 
+async def gather_with_concurrency(limit: int, *aws: t.Awaitable[R]) -> t.List[R]:
+    """Same as asyncio.gather, but with at most limit of the awaitables running at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw: t.Awaitable[R]) -> R:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+
 T = t.TypeVar("T")  # Generic type variable for devices
 
 
 class ToshibaAcCallback(t.Generic[T]):
+    __slots__ = ("callbacks",)
+
     def __init__(self) -> None:
         self.callbacks: t.List[t.Callable[[T], t.Optional[t.Awaitable[None]]]] = []
 
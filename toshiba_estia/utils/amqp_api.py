@@ -43,6 +43,10 @@ class ToshibaAcAmqpApi:
     async def shutdown(self) -> None:
         await self.device.shutdown()
 
+    @property
+    def connected(self) -> bool:
+        return bool(self.device.connected)
+
     def register_command_handler(self, command: str, handler: ToshibaAcAmqpApi._HANDLER_TYPE) -> None:
         if command not in self.COMMANDS:
             raise AttributeError(f'Unknown command: {command}, should be one of {" ".join(self.COMMANDS)}')
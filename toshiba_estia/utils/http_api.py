@@ -24,7 +24,7 @@ from toshiba_estia.utils import retry_with_timeout, retry_on_exception
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToshibaAcDeviceInfo:
     ac_id: str
     ac_unique_id: str
@@ -34,7 +34,7 @@ class ToshibaAcDeviceInfo:
     merit_feature: str
     ac_model_id: str
 
-@dataclass
+@dataclass(slots=True)
 class EstiaWaterTemperatureInfo:
     two: int
     twi: int
@@ -43,20 +43,25 @@ class EstiaWaterTemperatureInfo:
     tfi: int
     room_water: int
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToshibaAcDeviceAdditionalInfo:
     cdu: t.Optional[str]
     fcu: t.Optional[str]
     serial_number: t.Optional[str]
     temperatures: t.Optional[EstiaWaterTemperatureInfo]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class ToshibaAcDeviceCurrentState:
+    ac_state: str
+    additional_info: ToshibaAcDeviceAdditionalInfo
+
+@dataclass(frozen=True, slots=True)
 class ToshibaDevicesCount:
     total_count: int
     total_ac: int
     total_estia: int
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToshibaDeviceConnectionState:
     device_id: str
     online: bool
@@ -79,13 +84,15 @@ class ToshibaAcHttpApi:
     AC_ENERGY_CONSUMPTION_PATH = "/api/AC/GetGroupACEnergyConsumption"
     ALL_DEVICE_STATE_PATH = "/api/AC/GetAllDeviceState"
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(self, username: str, password: str, session: t.Optional[aiohttp.ClientSession] = None) -> None:
         self.username = username
         self.password = password
         self.access_token: t.Optional[str] = None
         self.access_token_type: t.Optional[str] = None
         self.consumer_id: t.Optional[str] = None
-        self.session: t.Optional[aiohttp.ClientSession] = None
+        # A session passed in is shared with other accounts and left open on shutdown
+        self.session: t.Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.device_counts: t.Optional[ToshibaDevicesCount] = None
 
     @retry_with_timeout(timeout=5, retries=3, backoff=60)
@@ -152,9 +159,10 @@ class ToshibaAcHttpApi:
         self.consumer_id = res["consumerId"]
 
     async def shutdown(self) -> None:
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
-            self.session = None
+
+        self.session = None
 
     async def get_devices_count(self) -> ToshibaDevicesCount:
         if not self.consumer_id:
@@ -216,11 +224,18 @@ class ToshibaAcHttpApi:
         return devices
 
     async def get_device_state(self, ac_id: str) -> str:
+        return (await self.get_device_current_state(ac_id)).ac_state
+
+    async def get_device_additional_info(self, ac_id: str) -> ToshibaAcDeviceAdditionalInfo:
+        return (await self.get_device_current_state(ac_id)).additional_info
+
+    async def get_device_current_state(self, ac_id: str) -> ToshibaAcDeviceCurrentState:
+        """State and extended info of a device, both served by AC_STATE_PATH, from a single request."""
         get = {
             "deviceuniqueId": ac_id,
         }
 
-        logger.debug(f"Requesting state for device_id: {ac_id}")
+        logger.debug(f"Requesting state and extended info for device_id: {ac_id}")
 
         res = await self.request_api(self.AC_STATE_PATH, get=get)
 
@@ -230,17 +245,10 @@ class ToshibaAcHttpApi:
         if not isinstance(res["ACStateData"], str):
             raise ToshibaAcHttpApiError("Malformed ACStateData in response")
 
-        return res["ACStateData"]
-
-    async def get_device_additional_info(self, ac_id: str) -> ToshibaAcDeviceAdditionalInfo:
-        get = {
-            "deviceuniqueId": ac_id,
-        }
-
-        logger.debug(f"Requesting extended info for device_id: {ac_id}")
-
-        res = await self.request_api(self.AC_STATE_PATH, get=get)
+        return ToshibaAcDeviceCurrentState(ac_state=res["ACStateData"], additional_info=self.parse_additional_info(res))
 
+    @staticmethod
+    def parse_additional_info(res: t.Any) -> ToshibaAcDeviceAdditionalInfo:
         try:
             cdu = res["Cdu"]["model_name"]
         except (KeyError, TypeError):
@@ -251,16 +259,22 @@ class ToshibaAcHttpApi:
         except (KeyError, TypeError):
             fcu = None
 
-        serial_number = res["Fcu"]["serial_number"]
+        try:
+            serial_number = res["Fcu"]["serial_number"]
+        except (KeyError, TypeError):
+            serial_number = None
 
-        water_temp = EstiaWaterTemperatureInfo(
-            two = int(res["TWO_Temp"], 16),
-            twi = int(res["TWI_Temp"], 16),
-            tho = int(res["THO_Temp"], 16),
-            to = int(res["TO_Temp"], 16),
-            tfi = int(res["TFI_Temp"],16),
-            room_water = int(res["RoomWater_temp"], 16)
-        )
+        try:
+            water_temp: t.Optional[EstiaWaterTemperatureInfo] = EstiaWaterTemperatureInfo(
+                two=int(res["TWO_Temp"], 16),
+                twi=int(res["TWI_Temp"], 16),
+                tho=int(res["THO_Temp"], 16),
+                to=int(res["TO_Temp"], 16),
+                tfi=int(res["TFI_Temp"], 16),
+                room_water=int(res["RoomWater_temp"], 16),
+            )
+        except (KeyError, TypeError, ValueError):
+            water_temp = None
 
         return ToshibaAcDeviceAdditionalInfo(cdu=cdu, fcu=fcu, serial_number=serial_number, temperatures=water_temp)
 
@@ -0,0 +1,300 @@
+# Copyright 2022 Kamil Sroka
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Periodic jobs of many devices run from one hierarchical timer wheel instead of one sleeping task each."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import typing as t
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+JobCallback = t.Callable[[], t.Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class ToshibaAcScheduledJobInfo:
+    name: str
+    interval_s: float
+    jitter_s: float
+    next_run: float
+    running: bool
+    runs: int
+    failures: int
+    overruns: int
+
+
+class ToshibaAcScheduledJob:
+    __slots__ = (
+        "name",
+        "interval_s",
+        "jitter_s",
+        "callback",
+        "base",
+        "deadline",
+        "cancelled",
+        "task",
+        "runs",
+        "failures",
+        "consecutive_failures",
+        "overruns",
+    )
+
+    def __init__(self, name: str, interval_s: float, jitter_s: float, callback: JobCallback) -> None:
+        self.name = name
+        self.interval_s = interval_s
+        self.jitter_s = jitter_s
+        self.callback = callback
+        # Loop time of the next run without and with jitter
+        self.base = 0.0
+        self.deadline = 0.0
+        self.cancelled = False
+        self.task: t.Optional[asyncio.Task[None]] = None
+        self.runs = 0
+        self.failures = 0
+        # Failed runs since the last successful one
+        self.consecutive_failures = 0
+        self.overruns = 0
+
+    def cancel(self) -> None:
+        # Removed from the wheel lazily, when its slot comes up
+        self.cancelled = True
+
+    async def cancel_and_wait(self) -> None:
+        """Cancel the job together with a run in progress, unless called from within that run."""
+        self.cancel()
+
+        task = self.task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def info(self) -> ToshibaAcScheduledJobInfo:
+        return ToshibaAcScheduledJobInfo(
+            self.name,
+            self.interval_s,
+            self.jitter_s,
+            self.deadline,
+            self.running,
+            self.runs,
+            self.failures,
+            self.overruns,
+        )
+
+
+class ToshibaAcScheduler:
+    """Runs periodic jobs from a hierarchical timer wheel driven by a single timer of the event loop.
+
+    Level 0 has one slot per tick, every higher level has slots LEVEL_SLOTS times wider. Jobs are placed on the
+    lowest level their deadline fits in and cascade to lower levels as the wheel turns, so scheduling and expiring a
+    job is O(1) regardless of how many jobs exist. Deadlines are rounded up to whole ticks.
+    """
+
+    LEVEL_BITS = 6
+    LEVEL_SLOTS = 1 << LEVEL_BITS
+    LEVELS = 4
+
+    def __init__(self, tick_s: float = 1.0) -> None:
+        self.tick_s = tick_s
+        self._wheels: t.List[t.List[t.List[ToshibaAcScheduledJob]]] = [
+            [[] for _ in range(self.LEVEL_SLOTS)] for _ in range(self.LEVELS)
+        ]
+        self._jobs: t.Dict[str, ToshibaAcScheduledJob] = {}
+        self._tick = 0
+        self._start_time = 0.0
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self._handle: t.Optional[asyncio.TimerHandle] = None
+        self._tasks: t.Set[asyncio.Task[None]] = set()
+
+    def start(self) -> None:
+        if self._loop:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._start_time = self._loop.time()
+        self._tick = 0
+
+        for job in self._jobs.values():
+            self._insert(job)
+
+        self._schedule_next_tick()
+
+    async def shutdown(self) -> None:
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+        self._loop = None
+
+        for job in self._jobs.values():
+            job.cancel()
+        self._jobs.clear()
+
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def schedule(
+        self,
+        name: str,
+        interval_s: float,
+        callback: JobCallback,
+        jitter_s: float = 0.0,
+        first_delay_s: t.Optional[float] = None,
+    ) -> ToshibaAcScheduledJob:
+        """Run callback every interval_s plus a random 0..jitter_s, replacing an earlier job of the same name.
+
+        The first run happens after first_delay_s, by default after a random part of the interval so that jobs
+        scheduled together spread out.
+        """
+        if interval_s <= 0:
+            raise ValueError(f"Job interval must be positive, got {interval_s}")
+
+        self.cancel(name)
+
+        job = ToshibaAcScheduledJob(name, interval_s, jitter_s, callback)
+        delay = random.uniform(0, interval_s) if first_delay_s is None else first_delay_s
+        job.base = self._now() + delay
+        job.deadline = job.base + random.uniform(0, jitter_s)
+        self._jobs[name] = job
+
+        if self._loop:
+            self._insert(job)
+
+        return job
+
+    def cancel(self, name: str) -> bool:
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return False
+
+        job.cancel()
+        return True
+
+    def job(self, name: str) -> t.Optional[ToshibaAcScheduledJob]:
+        return self._jobs.get(name)
+
+    def jobs(self) -> t.List[ToshibaAcScheduledJobInfo]:
+        return [job.info() for job in self._jobs.values() if not job.cancelled]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def running_jobs(self) -> int:
+        return len(self._tasks)
+
+    def _now(self) -> float:
+        return self._loop.time() if self._loop else asyncio.get_running_loop().time()
+
+    def _deadline_tick(self, deadline: float) -> int:
+        # Rounded up so that jobs never run early
+        return -int(-(deadline - self._start_time) // self.tick_s)
+
+    def _insert(self, job: ToshibaAcScheduledJob) -> None:
+        delta = max(1, self._deadline_tick(job.deadline) - self._tick)
+
+        level = 0
+        while level < self.LEVELS - 1 and delta >= 1 << (self.LEVEL_BITS * (level + 1)):
+            level += 1
+
+        # Deadlines beyond the last level wait in its furthest slot and are placed again when it comes up
+        max_delta = (1 << (self.LEVEL_BITS * self.LEVELS)) - 1
+        tick = self._tick + min(delta, max_delta)
+
+        slot = (tick >> (self.LEVEL_BITS * level)) & (self.LEVEL_SLOTS - 1)
+        self._wheels[level][slot].append(job)
+
+    def _schedule_next_tick(self) -> None:
+        assert self._loop
+        when = self._start_time + (self._tick + 1) * self.tick_s
+        self._handle = self._loop.call_at(when, self._on_tick)
+
+    def _on_tick(self) -> None:
+        self._tick += 1
+        tick = self._tick
+
+        # Cascade higher levels whose slot boundary was crossed, from the top so that jobs can fall through
+        for level in range(self.LEVELS - 1, 0, -1):
+            if tick & ((1 << (self.LEVEL_BITS * level)) - 1) == 0:
+                slot = (tick >> (self.LEVEL_BITS * level)) & (self.LEVEL_SLOTS - 1)
+                jobs = self._wheels[level][slot]
+                self._wheels[level][slot] = []
+                for job in jobs:
+                    self._insert_or_run(job)
+
+        slot = tick & (self.LEVEL_SLOTS - 1)
+        jobs = self._wheels[0][slot]
+        self._wheels[0][slot] = []
+        for job in jobs:
+            self._insert_or_run(job)
+
+        self._schedule_next_tick()
+
+    def _insert_or_run(self, job: ToshibaAcScheduledJob) -> None:
+        if job.cancelled:
+            # Jobs cancelled through the job itself are only forgotten here
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+        elif self._deadline_tick(job.deadline) > self._tick:
+            self._insert(job)
+        else:
+            self._run(job)
+
+    def _run(self, job: ToshibaAcScheduledJob) -> None:
+        assert self._loop
+        now = self._loop.time()
+
+        if job.running:
+            # A slow run keeps its task, the missed run is only counted
+            job.overruns += 1
+        else:
+            job.task = self._loop.create_task(self._run_job(job))
+            self._tasks.add(job.task)
+            job.task.add_done_callback(self._tasks.discard)
+
+        # Keep the phase of the job, but skip runs missed while the loop was blocked
+        job.base += job.interval_s
+        if job.base <= now:
+            job.base = now + job.interval_s
+        job.deadline = job.base + random.uniform(0, job.jitter_s)
+
+        self._insert(job)
+
+    async def _run_job(self, job: ToshibaAcScheduledJob) -> None:
+        try:
+            await job.callback()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.consecutive_failures += 1
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        else:
+            job.consecutive_failures = 0
+        finally:
+            job.runs += 1